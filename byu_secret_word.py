@@ -1,61 +1,167 @@
-#code is organized in functions to make more readable and maintainable
-#number of attempts is limited to 6
-def user_input(default_word:str):
-    while True:
-        guess = input("Word: ")
-        if len(default_word) != len(guess):
-            print("Invalid input size")
-            continue
-        
-        return guess
-
-
-def initialize_game(default_word:str, guess:str):
-    container = ["_"] * len(guess)
-    matches = [False] * len(guess)
-    if guess == default_word:
-        print("Correct")
-        return guess
-
-    for idx, letter in enumerate(default_word):
-        if guess[idx].lower() == letter:
-            container[idx] = letter.upper()
-            matches[idx] = True
-
-    for n_idx, letter in enumerate(default_word):
-        if container[n_idx] ==  "_" and matches[n_idx] == False:
-            for i, j in enumerate(guess):
-                if j.lower() == letter:
-                    container[i] = letter.lower()
-
-    return ' '.join(container)
-
-
-print("Welcome to the guessing game")
-default_word = "mosiah"
-hint = "_ " * len(default_word)
-print(f"Hint: {hint}")
-
-response = input("Would you like to play the guessing game? (yes/no) ")
-while True:
-    if response.lower() == "yes":
-        attempts = 0
-        while True:
-            guess = user_input(default_word)
-            attempts += 1
-            start_game = initialize_game(default_word, guess)
-            print(start_game)
-            hint = start_game
-            if guess.lower() == default_word:
-                print(f"Congratulations! You guessed the word in {attempts} attempts.")
-                break
-            if attempts >= 6:
-                print(f"Out of attempts. The word was: {default_word}")
-                break
-        break
-    elif response.lower() == "no":
-        print("Exiting...")
-        break
-    else:
-        print("Invalid input")
-        response = input("Would you like to play the guessing game? (yes/no) ")
\ No newline at end of file
+#code is organized in functions to make more readable and maintainable
+#number of attempts is limited to 6
+"""Console version of the guessing game, and a streaming batch scorer.
+
+    python byu_secret_word.py                      # play against "mosiah"
+    python byu_secret_word.py --word temple        # play against another word
+    python byu_secret_word.py --score pairs.txt    # grade (target, guess) pairs
+    zcat guesses.gz | python byu_secret_word.py --score - > graded.tsv
+
+Letters are marked with the same duplicate-aware rules as the GUI (greens
+first, then each yellow uses up one remaining copy of the letter in the word):
+uppercase is the right letter in the right place, lowercase is in the word
+elsewhere, and "_" is not in the word (or all its copies are already marked).
+
+In scoring mode each input line holds a target and a guess separated by a comma,
+tab or spaces. Lines are read in chunks, scored with one vectorized call per
+word length, and written out in input order as
+``target<TAB>guess<TAB>code<TAB>marks``, where code is the base-3 pattern code
+used throughout the game. A blank line, a line without a valid pair, or a pair
+longer than feedback.MAX_PATTERN_LENGTH letters gets code -1.
+"""
+import argparse
+import sys
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+import feedback
+
+DEFAULT_WORD = "mosiah"
+MAX_ATTEMPTS = 6
+# Input lines scored per vectorized call
+CHUNK_LINES = 1 << 16
+
+
+def user_input(default_word:str):
+    while True:
+        guess = input("Word: ")
+        if len(default_word) != len(guess):
+            print("Invalid input size")
+            continue
+
+        return guess
+
+
+def marks(guess: str, code: int) -> List[str]:
+    """Per-letter marks of a scored guess: uppercase, lowercase or "_" """
+    states = feedback.decode_pattern(code, len(guess))
+    return [
+        ch.upper() if state == feedback.CORRECT else ch.lower() if state == feedback.PRESENT else "_"
+        for ch, state in zip(guess, states)
+    ]
+
+
+def initialize_game(default_word:str, guess:str):
+    if guess == default_word:
+        print("Correct")
+        return guess
+    return ' '.join(marks(guess, feedback.score(guess.lower(), default_word)))
+
+
+def play(default_word: str = DEFAULT_WORD, attempts_allowed: int = MAX_ATTEMPTS):
+    """Interactive console game"""
+    print("Welcome to the guessing game")
+    hint = "_ " * len(default_word)
+    print(f"Hint: {hint}")
+
+    response = input("Would you like to play the guessing game? (yes/no) ")
+    while True:
+        if response.lower() == "yes":
+            attempts = 0
+            while True:
+                guess = user_input(default_word)
+                attempts += 1
+                start_game = initialize_game(default_word, guess)
+                print(start_game)
+                hint = start_game
+                if guess.lower() == default_word:
+                    print(f"Congratulations! You guessed the word in {attempts} attempts.")
+                    break
+                if attempts >= attempts_allowed:
+                    print(f"Out of attempts. The word was: {default_word}")
+                    break
+            break
+        elif response.lower() == "no":
+            print("Exiting...")
+            break
+        else:
+            print("Invalid input")
+            response = input("Would you like to play the guessing game? (yes/no) ")
+
+
+def parse_pair(line: str) -> Optional[Tuple[str, str]]:
+    """(target, guess) from one input line, lowercased, or None if the line is not a valid pair"""
+    parts = line.replace(",", " ").split()
+    if len(parts) != 2:
+        return None
+    target, guess = parts[0].lower(), parts[1].lower()
+    if len(target) != len(guess) or not (target + guess).isascii() or not (target + guess).isalpha():
+        return None
+    if len(target) > feedback.MAX_PATTERN_LENGTH:
+        return None
+    return target, guess
+
+
+def score_lines(lines: List[str]) -> List[str]:
+    """Output lines for one chunk of input lines, in order"""
+    pairs = [parse_pair(line) for line in lines]
+    codes: List[int] = [-1] * len(pairs)
+    by_length = {}
+    for k, pair in enumerate(pairs):
+        if pair is not None:
+            by_length.setdefault(len(pair[0]), []).append(k)
+    for rows in by_length.values():
+        scored = feedback.score_pairs([pairs[k][1] for k in rows], [pairs[k][0] for k in rows])
+        for k, code in zip(rows, scored.tolist()):
+            codes[k] = code
+    out = []
+    for line, pair, code in zip(lines, pairs, codes):
+        if pair is None:
+            out.append(f"{line.strip().replace(chr(9), ' ')}\t\t-1\t\n")
+        else:
+            out.append(f"{pair[0]}\t{pair[1]}\t{code}\t{''.join(marks(pair[1], code))}\n")
+    return out
+
+
+def score_stream(lines: Iterable[str], chunk_lines: int = CHUNK_LINES) -> Iterator[str]:
+    """Score a stream of input lines chunk by chunk, yielding one output string per chunk"""
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_lines))
+        if not chunk:
+            return
+        # Blank lines get a -1 row too, so output line k always answers input line k
+        yield "".join(score_lines(chunk))
+
+
+def score_file(source: IO[str], sink: IO[str], chunk_lines: int = CHUNK_LINES) -> None:
+    for block in score_stream(source, chunk_lines):
+        sink.write(block)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Play the console guessing game or grade logged guesses.")
+    parser.add_argument("--word", default=DEFAULT_WORD, help="secret word for the interactive game")
+    parser.add_argument("--score", metavar="FILE",
+                        help="grade (target, guess) lines from FILE ('-' for stdin) instead of playing")
+    parser.add_argument("--output", metavar="FILE", help="write graded lines here instead of stdout")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES, help="input lines scored per batch")
+    args = parser.parse_args(argv)
+
+    if args.score is None:
+        play(args.word.lower())
+        return 0
+    source = sys.stdin if args.score == "-" else open(args.score, "r", encoding="utf-8", errors="replace")
+    sink = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+    try:
+        score_file(source, sink, max(1, args.chunk_lines))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
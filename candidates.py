@@ -0,0 +1,65 @@
+"""Live set of words still consistent with the feedback of a game so far."""
+from typing import List, Optional
+
+import numpy as np
+
+import feedback
+from metrics import metrics
+from word_index import WordStore
+
+
+class CandidateSet:
+    """Index array over a WordStore, narrowed once per submitted guess.
+
+    Each narrowing only looks at the words that survived the previous guess,
+    using the precomputed feedback matrix when the guess is in it and one
+    vectorized scoring pass otherwise.
+    """
+
+    def __init__(self, store: WordStore):
+        self.store = store
+        self.indices = np.arange(len(store), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def reset(self):
+        """Every word is a candidate again"""
+        self.indices = np.arange(len(self.store), dtype=np.int32)
+
+    def copy(self) -> "CandidateSet":
+        """Independent set over the same store, e.g. one per board"""
+        other = CandidateSet.__new__(CandidateSet)
+        other.store = self.store
+        other.indices = self.indices.copy()
+        return other
+
+    def patterns(self, guess: str, matrix=None) -> np.ndarray:
+        """Pattern codes of a guess against every remaining candidate"""
+        if matrix is not None:
+            g = self.store.index_of(guess)
+            if g is not None:
+                return matrix.codes[g, self.indices]
+        return feedback.score_batch(guess, self.store.letters[self.indices])
+
+    @metrics.timed("candidates.narrow")
+    def narrow(self, guess: str, code: int, matrix=None):
+        """Keep only the candidates that would have produced this pattern for the guess"""
+        if len(guess) != self.store.length or not len(self.indices):
+            return
+        self.indices = self.indices[self.patterns(guess, matrix) == code]
+
+    def narrow_to_largest(self, guess: str, matrix=None) -> int:
+        """Keep the largest group of candidates sharing one pattern for the guess; returns that pattern.
+
+        One batched scoring pass and a bincount split the whole set at once. Ties go to
+        the lowest code, which reveals the least.
+        """
+        patterns = self.patterns(guess, matrix)
+        code = int(np.argmax(np.bincount(patterns, minlength=3 ** self.store.length)))
+        self.indices = self.indices[patterns == code]
+        return code
+
+    def words(self, limit: Optional[int] = None) -> List[str]:
+        indices = self.indices if limit is None else self.indices[:limit]
+        return [self.store[int(i)] for i in indices]
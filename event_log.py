@@ -0,0 +1,211 @@
+"""Append-only binary log of a game session, replayed by replay.py.
+
+A log is a header followed by one record per player action, in the order the
+view applied them to the engine. Each record is a kind byte, the milliseconds
+since the previous record as a varint, and a small fixed payload, so a typical
+keystroke takes 3 bytes. The session's RNG seed and every target drawn are
+logged too: with a persisted no-repeat bag, draws depend on earlier sessions,
+so replays take the targets from the log rather than drawing them again.
+
+Enable with ``python word_game.py --event-log DIR`` (or WORD_GAME_EVENT_LOG=DIR);
+each session writes its own ``session-<time>-<pid>-<n>.wgl`` file there.
+"""
+import atexit
+import itertools
+import os
+import struct
+import threading
+import time
+import weakref
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+EVENT_LOG_ENV = "WORD_GAME_EVENT_LOG"
+MAGIC = b"WGEL"
+VERSION = 1
+# Buffered records of an active session reach the file at least this often, not only at game ends
+FLUSH_SECONDS = 5.0
+
+# Event kinds
+SEED = 0
+TARGETS = 1
+RESULT = 2
+LETTER = 3
+BACKSPACE = 4
+ENTER = 5
+BEGIN = 6
+PAUSE = 7
+END = 8
+PLAY_AGAIN = 9
+LENGTH = 10
+BOARDS = 11
+ADVERSARIAL = 12
+HARD_MODE = 13
+VALID_WORDS = 14
+
+KIND_NAMES = {
+    SEED: "seed", TARGETS: "targets", RESULT: "result", LETTER: "letter", BACKSPACE: "backspace",
+    ENTER: "enter", BEGIN: "begin", PAUSE: "pause", END: "end", PLAY_AGAIN: "play_again",
+    LENGTH: "length", BOARDS: "boards", ADVERSARIAL: "adversarial", HARD_MODE: "hard_mode",
+    VALID_WORDS: "valid_words",
+}
+# Kinds whose payload is one byte
+_BYTE_KINDS = frozenset((LETTER, LENGTH, BOARDS, ADVERSARIAL, HARD_MODE, VALID_WORDS))
+
+_HEADER = struct.Struct("<4sBdH")
+_session_numbers = itertools.count(1)
+
+
+class Event(NamedTuple):
+    kind: int
+    ms: int
+    # Letter (str), setting (int), seed (int), targets (List[str]), result ((won, attempts)) or None
+    value: object
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def encode(kind: int, ms: int, value=None) -> bytes:
+    """One record"""
+    head = bytes((kind,)) + _varint(ms)
+    if kind == LETTER:
+        return head + value.encode("ascii")
+    if kind in _BYTE_KINDS:
+        return head + bytes((int(value),))
+    if kind == SEED:
+        return head + struct.pack("<Q", value)
+    if kind == TARGETS:
+        words = [w.encode("ascii", "replace") for w in value]
+        return head + bytes((len(words), len(words[0]) if words else 0)) + b"".join(words)
+    if kind == RESULT:
+        won, attempts = value
+        return head + bytes((int(won), attempts))
+    return head
+
+
+class EventLogWriter:
+    """Appends a session's events to its own file.
+
+    Writes are buffered and flushed at game ends, on any write FLUSH_SECONDS after
+    the last flush, and on close().
+    close() releases the file when the page disconnects; a later write (the player
+    reconnected) reopens it and carries on appending.
+    """
+
+    def __init__(self, path: str, index_key: str = ""):
+        self.path = path
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self._last = self._flushed = time.monotonic()
+        key = index_key.encode("utf-8")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, time.time(), len(key)) + key)
+        _open_writers.add(self)
+
+    def write(self, kind: int, value=None):
+        with self._lock:
+            if self._file is None:
+                try:
+                    self._file = open(self.path, "ab")
+                except OSError:
+                    return
+                _open_writers.add(self)
+            now = time.monotonic()
+            ms = int((now - self._last) * 1000)
+            self._last = now
+            self._file.write(encode(kind, ms, value))
+            if kind == RESULT or now - self._flushed >= FLUSH_SECONDS:
+                self._file.flush()
+                self._flushed = now
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            _open_writers.discard(self)
+
+
+# Writers with an open file, closed at exit; weak so finished sessions are not kept alive
+_open_writers: "weakref.WeakSet[EventLogWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+def open_session_log(directory: Optional[str] = None, index_key: str = "") -> Optional[EventLogWriter]:
+    """A writer for a new session file, or None when logging is off or the directory is unusable"""
+    directory = directory or os.environ.get(EVENT_LOG_ENV)
+    if not directory:
+        return None
+    name = f"session-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_session_numbers)}.wgl"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        return EventLogWriter(os.path.join(directory, name), index_key)
+    except OSError:
+        return None
+
+
+def read(path: str) -> Tuple[Dict, List[Event]]:
+    """Header fields and every complete event of a log (a torn final record is dropped)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, started, key_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} event log")
+    pos = _HEADER.size
+    header = {"version": version, "started": started, "index_key": data[pos:pos + key_len].decode("utf-8")}
+    pos += key_len
+    events: List[Event] = []
+    end = len(data)
+    byte_kinds = _BYTE_KINDS
+    try:
+        while pos < end:
+            kind = data[pos]
+            ms = shift = 0
+            while True:
+                pos += 1
+                b = data[pos]
+                ms |= (b & 0x7F) << shift
+                shift += 7
+                if b < 0x80:
+                    break
+            pos += 1
+            if kind == LETTER:
+                value = chr(data[pos])
+                pos += 1
+            elif kind in byte_kinds:
+                value = data[pos]
+                pos += 1
+            elif kind == SEED:
+                if pos + 8 > end:
+                    break
+                value = struct.unpack_from("<Q", data, pos)[0]
+                pos += 8
+            elif kind == TARGETS:
+                count, length = data[pos], data[pos + 1]
+                pos += 2
+                if pos + count * length > end:
+                    break
+                value = [data[pos + i * length:pos + (i + 1) * length].decode("ascii") for i in range(count)]
+                pos += count * length
+            elif kind == RESULT:
+                value = (bool(data[pos]), data[pos + 1])
+                pos += 2
+            else:
+                value = None
+            if pos > end:
+                break
+            events.append(Event(kind, ms, value))
+    except IndexError:
+        # The session was cut off mid-record
+        pass
+    return header, events
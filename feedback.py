@@ -0,0 +1,150 @@
+"""Theme-independent feedback scoring.
+
+A guess is scored against a target with the usual two-pass rules (greens
+first, then yellows only up to the target's remaining letter counts). Results are compact base-3 pattern codes:
+position i contributes state * 3**i, with ABSENT=0, PRESENT=1, CORRECT=2.
+
+The scalar functions are pure Python; NumPy is only imported by the batch
+functions, so the game engine can score without loading it.
+"""
+from typing import TYPE_CHECKING, List, Sequence, Union
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ABSENT = 0
+PRESENT = 1
+CORRECT = 2
+
+# Upper bound on guess x target pairs held in memory per chunk
+CHUNK_ELEMENTS = 1 << 21
+
+Words = Union[str, Sequence[str], "np.ndarray"]
+
+# Longest word whose pattern codes fit in an unsigned 64-bit integer (3 ** 40 < 2 ** 64)
+MAX_PATTERN_LENGTH = 40
+
+_WEIGHTS = tuple(3 ** i for i in range(MAX_PATTERN_LENGTH))
+
+
+def pattern_dtype(length: int) -> "np.dtype":
+    """Smallest unsigned dtype that holds every pattern code for this word length"""
+    import numpy as np
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if 3 ** length <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    raise ValueError(f"pattern codes of {length}-letter words do not fit in 64 bits")
+
+
+def encode_pattern(states: Sequence[int]) -> int:
+    code = 0
+    for i, state in enumerate(states):
+        code += state * 3 ** i
+    return code
+
+
+def decode_pattern(code: int, length: int) -> List[int]:
+    states = []
+    for _ in range(length):
+        code, state = divmod(code, 3)
+        states.append(state)
+    return states
+
+
+def encode_words(words: Words) -> "np.ndarray":
+    """Pack words into an N x length uint8 matrix of ASCII bytes (a WordStore matrix passes through)"""
+    import numpy as np
+    if isinstance(words, np.ndarray):
+        return words if words.ndim == 2 else words.reshape(1, -1)
+    if isinstance(words, str):
+        words = [words]
+    words = list(words)
+    length = len(words[0]) if words else 0
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), length)
+
+
+@metrics.timed("feedback.score")
+def score(guess: str, target: str) -> int:
+    """Pattern code of one guess against one target (pure Python, for single lookups)"""
+    # Target letters not matched in place; each yellow consumes one of them
+    remaining = [t for g, t in zip(guess, target) if g != t]
+    code = 0
+    for i, g in enumerate(guess):
+        if g == target[i]:
+            code += CORRECT * _WEIGHTS[i]
+        elif g in remaining:
+            remaining.remove(g)
+            code += PRESENT * _WEIGHTS[i]
+    return code
+
+
+def _score_chunk(g: "np.ndarray", t: "np.ndarray") -> "np.ndarray":
+    # A non-green guess letter at position i is yellow iff the target has more
+    # unmatched copies of it than earlier non-green positions of the guess have
+    # already claimed; that is exactly what the sequential second pass computes.
+    # Working one position at a time keeps every temporary a small 2-D array.
+    import numpy as np
+    length = g.shape[1]
+    shape = (g.shape[0], t.shape[0])
+    dtype = pattern_dtype(length)
+    green = [g[:, i][:, None] == t[:, i][None, :] for i in range(length)]
+    unmatched = [~matched for matched in green]
+    codes = np.zeros(shape, dtype=dtype)
+    for i in range(length):
+        letter = g[:, i][:, None]
+        available = np.zeros(shape, dtype=np.uint8)
+        for k in range(length):
+            available += (t[:, k][None, :] == letter) & unmatched[k]
+        claimed = np.zeros(shape, dtype=np.uint8)
+        for j in range(i):
+            claimed += (g[:, j] == g[:, i])[:, None] & unmatched[j]
+        present = (claimed < available) & unmatched[i]
+        codes += (green[i] * dtype.type(CORRECT) + present) * dtype.type(3 ** i)
+    return codes
+
+
+def score_batch(guesses: Words, targets: Words, chunk_elements: int = CHUNK_ELEMENTS) -> "np.ndarray":
+    """Score guesses against targets in one vectorized call.
+
+    Returns a (len(guesses), len(targets)) array of pattern codes, or a 1-D array
+    over targets when a single guess string is passed.
+    """
+    import numpy as np
+    single = isinstance(guesses, str)
+    g = encode_words(guesses)
+    t = encode_words(targets)
+    if len(g) and len(t) and g.shape[1] != t.shape[1]:
+        raise ValueError("guesses and targets must have the same word length")
+    length = g.shape[1] if len(g) else t.shape[1]
+    out = np.empty((g.shape[0], t.shape[0]), dtype=pattern_dtype(length))
+    rows = max(1, chunk_elements // max(1, t.shape[0]))
+    for start in range(0, g.shape[0] if len(t) else 0, rows):
+        out[start:start + rows] = _score_chunk(g[start:start + rows], t)
+    return out[0] if single else out
+
+
+def score_pairs(guesses: Words, targets: Words) -> "np.ndarray":
+    """Pattern code of guesses[k] against targets[k] for every k (same rules as score)"""
+    import numpy as np
+    g = encode_words(guesses)
+    t = encode_words(targets)
+    if g.shape != t.shape:
+        raise ValueError("score_pairs needs as many targets as guesses, all of one word length")
+    length = g.shape[1]
+    dtype = pattern_dtype(length)
+    # As _score_chunk, with one target per guess instead of every target
+    unmatched = [g[:, i] != t[:, i] for i in range(length)]
+    codes = np.zeros(g.shape[0], dtype=dtype)
+    for i in range(length):
+        letter = g[:, i]
+        available = np.zeros(g.shape[0], dtype=np.uint8)
+        for k in range(length):
+            available += (t[:, k] == letter) & unmatched[k]
+        claimed = np.zeros(g.shape[0], dtype=np.uint8)
+        for j in range(i):
+            claimed += (g[:, j] == letter) & unmatched[j]
+        present = (claimed < available) & unmatched[i]
+        codes += (~unmatched[i] * dtype.type(CORRECT) + present) * dtype.type(3 ** i)
+    return codes
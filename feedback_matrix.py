@@ -0,0 +1,243 @@
+"""Precomputed guess x answer feedback-pattern matrix, persisted next to words.txt.
+
+Row g, column a holds feedback.score(words[g], words[a]) for one word length,
+so analysis and hint features can look patterns up instead of scoring. The
+matrix is built in parallel across cores and, when the word list changes, only
+the rows and columns of new words are scored again.
+
+Run ``python feedback_matrix.py [LENGTH ...]`` to prebuild it (default: 5 letters).
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+import feedback
+import word_index
+from word_index import WordStore
+
+# Below this many new words an incremental rebuild beats a full one
+INCREMENTAL_MAX_FRACTION = 0.5
+# Rows scored per task, so a cancelled build stops within one small block
+FILL_ROWS = 512
+# Where the owner's pid cannot be checked, a temp file untouched this long is an orphan
+STALE_TMP_SECONDS = 600.0
+_TMP_SUFFIX = ".tmp.npy"
+
+
+class BuildCancelled(Exception):
+    """A build was cancelled; its temporary files have been removed"""
+
+
+_build_locks: Dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+def matrix_path(length: int, words_file: str = word_index.WORDS_FILE) -> str:
+    directory = os.path.dirname(os.path.abspath(words_file))
+    return os.path.join(directory, f"feedback_{length}.npy")
+
+
+def _words_path(path: str) -> str:
+    # Snapshot of the word order the matrix was built for
+    return path[:-len(".npy")] + ".words.npy"
+
+
+class FeedbackMatrix:
+    """Read-only guess x answer pattern codes over the words of one WordStore"""
+
+    def __init__(self, store: WordStore, codes: np.ndarray):
+        self.store = store
+        # Plain ndarray view over the mapping; np.memmap adds overhead to every index
+        self.codes = np.asarray(codes)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def pattern(self, guess_index: int, answer_index: int) -> int:
+        """O(1) pattern code for a pair of word indices"""
+        return int(self.codes[guess_index, answer_index])
+
+    def row(self, guess_index: int) -> np.ndarray:
+        """Patterns of one guess against every answer"""
+        return self.codes[guess_index]
+
+    def lookup(self, guess: str, answer: str) -> Optional[int]:
+        """Pattern code for two words, or None if either is not in the list"""
+        g = self.store.index_of(guess)
+        if g is None:
+            return None
+        a = self.store.index_of(answer)
+        if a is None:
+            return None
+        return int(self.codes[g, a])
+
+
+def _fill(path: str, letters: np.ndarray, rows: np.ndarray, cols: Optional[np.ndarray]):
+    # Worker: score a block of rows and write it straight into the shared .npy
+    codes = np.load(path, mmap_mode="r+")
+    targets = letters if cols is None else letters[cols]
+    block = feedback.score_batch(letters[rows], targets)
+    if cols is None:
+        codes[rows] = block
+    else:
+        codes[np.ix_(rows, cols)] = block
+    codes.flush()
+
+
+def _fill_parallel(path: str, letters: np.ndarray, rows: np.ndarray, cols: Optional[np.ndarray],
+                   workers: Optional[int], cancel: Optional[threading.Event] = None):
+    workers = workers or os.cpu_count() or 1
+    if not len(rows) or (cols is not None and not len(cols)):
+        return
+    parts = max(workers * 4, -(-len(rows) // FILL_ROWS))
+    chunks = [c for c in np.array_split(rows, min(len(rows), parts)) if len(c)]
+    if workers == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            if cancel is not None and cancel.is_set():
+                raise BuildCancelled()
+            _fill(path, letters, chunk, cols)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_fill, path, letters, chunk, cols) for chunk in chunks]
+        for future in futures:
+            if cancel is not None and cancel.is_set():
+                for pending in futures:
+                    pending.cancel()
+                raise BuildCancelled()
+            future.result()
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows; the age check decides instead
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _remove_stale_tmp(path: str):
+    """Delete temp files of earlier builds of this matrix whose process is gone (crashed or killed)"""
+    directory = os.path.dirname(path)
+    prefixes = (os.path.basename(path) + ".", os.path.basename(_words_path(path)) + ".")
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return
+    now = time.time()
+    for entry in entries:
+        prefix = next((p for p in prefixes if entry.startswith(p)), None)
+        if prefix is None or not entry.endswith(_TMP_SUFFIX):
+            continue
+        pid = entry[len(prefix):-len(_TMP_SUFFIX)]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        full = os.path.join(directory, entry)
+        try:
+            if not _pid_alive(int(pid)) or now - os.path.getmtime(full) > STALE_TMP_SECONDS:
+                os.remove(full)
+        except OSError:
+            pass
+
+
+def load(store: WordStore, words_file: str = word_index.WORDS_FILE) -> Optional[FeedbackMatrix]:
+    """Memory-map the saved matrix if it was built for exactly this word list, else None"""
+    path = matrix_path(store.length, words_file)
+    try:
+        built_for = np.load(_words_path(path), mmap_mode="r")
+        if built_for.shape != store.letters.shape or not np.array_equal(built_for, store.letters):
+            return None
+        codes = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if codes.shape != (len(store), len(store)):
+        return None
+    return FeedbackMatrix(store, codes)
+
+
+def build(store: WordStore, words_file: str = word_index.WORDS_FILE,
+          workers: Optional[int] = None, cancel: Optional[threading.Event] = None) -> FeedbackMatrix:
+    """Build (or incrementally rebuild) the matrix for a store and save it next to words.txt.
+
+    Setting ``cancel`` stops the build between blocks with BuildCancelled. A build
+    that fails or is cancelled removes its temporary files; ones left by a killed
+    process are swept by the next build.
+    """
+    path = matrix_path(store.length, words_file)
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(path, threading.Lock())
+    # Temp files are named by pid, so two builds of one matrix in a process must not overlap
+    with lock:
+        matrix = load(store, words_file)
+        if matrix is not None:
+            # Another thread built it while this one waited
+            return matrix
+        _remove_stale_tmp(path)
+        tmp = f"{path}.{os.getpid()}{_TMP_SUFFIX}"
+        words_tmp = f"{_words_path(path)}.{os.getpid()}{_TMP_SUFFIX}"
+        try:
+            return _build(store, path, tmp, words_tmp, workers, cancel)
+        except BaseException:
+            for leftover in (tmp, words_tmp):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+            raise
+
+
+def _build(store: WordStore, path: str, tmp: str, words_tmp: str, workers: Optional[int],
+           cancel: Optional[threading.Event]) -> FeedbackMatrix:
+    letters = np.ascontiguousarray(store.letters)
+    n = len(store)
+    np.lib.format.open_memmap(tmp, mode="w+", dtype=feedback.pattern_dtype(store.length), shape=(n, n)).flush()
+
+    new_rows = np.arange(n)
+    try:
+        old_letters = np.load(_words_path(path))
+        old_codes = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        old_letters = old_codes = None
+    if old_codes is not None and old_letters.shape[1] == store.length and old_codes.shape[0] == len(old_letters):
+        old_index = {row.tobytes(): i for i, row in enumerate(old_letters)}
+        mapped = np.array([old_index.get(row.tobytes(), -1) for row in letters], dtype=np.int64)
+        kept = np.flatnonzero(mapped >= 0)
+        if n - len(kept) <= INCREMENTAL_MAX_FRACTION * n:
+            codes = np.load(tmp, mmap_mode="r+")
+            codes[np.ix_(kept, kept)] = old_codes[np.ix_(mapped[kept], mapped[kept])]
+            codes.flush()
+            del codes
+            new_rows = np.flatnonzero(mapped < 0)
+            # Old guesses only need scoring against the new answers
+            _fill_parallel(tmp, letters, kept, new_rows, workers, cancel)
+    del old_codes
+    _fill_parallel(tmp, letters, new_rows, None, workers, cancel)
+
+    np.save(words_tmp, letters)
+    os.replace(tmp, path)
+    os.replace(words_tmp, _words_path(path))
+    return FeedbackMatrix(store, np.load(path, mmap_mode="r"))
+
+
+def load_or_build(store: WordStore, words_file: str = word_index.WORDS_FILE,
+                  workers: Optional[int] = None) -> FeedbackMatrix:
+    matrix = load(store, words_file)
+    if matrix is None:
+        matrix = build(store, words_file, workers)
+    return matrix
+
+
+if __name__ == "__main__":
+    words_by_length = word_index.load_index()
+    for length in [int(arg) for arg in sys.argv[1:]] or [5]:
+        matrix = load_or_build(words_by_length[length])
+        print(f"feedback matrix: {len(matrix)} x {len(matrix)} -> {matrix_path(length)}")
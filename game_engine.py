@@ -0,0 +1,415 @@
+"""Headless game rules for the word guessing game.
+
+GameEngine holds all game state and enforces the rules without importing Flet,
+so games can be played in simulations, tests and server-side validation. The
+Flet UI in word_game.py is a thin view over one engine.
+"""
+import random
+from typing import Dict, List, Optional
+
+import feedback
+from hard_mode import Constraints
+from metrics import metrics
+
+FALLBACK_WORD = "hello"
+# letter_states entry for a letter no guess has used yet; the others are feedback states
+UNKNOWN = -1
+# Last-resort targets for the other playable lengths
+FALLBACK_WORDS_BY_LENGTH = {5: FALLBACK_WORD, 6: "little", 7: "another", 8: "anything"}
+# Redraws allowed when looking for a target the valid-words lexicon accepts
+VALID_TARGET_TRIES = 100
+
+_english_words: Optional[Dict[int, List[str]]] = None
+
+
+def english_words(length: int) -> List[str]:
+    """Words of one length from the english_words package, imported and grouped once on first use"""
+    global _english_words
+    if _english_words is None:
+        # Imported here so the engine itself does not load word_index (and NumPy)
+        from word_index import dictionary_words
+        all_words = dictionary_words()
+        grouped: Dict[int, List[str]] = {}
+        for w in sorted(all_words):
+            if w.isalpha():
+                grouped.setdefault(len(w), []).append(w)
+        _english_words = grouped
+    return _english_words.get(length, [])
+
+
+class GameEngine:
+    """State and rules of one game.
+
+    Mutators return True when they changed the state, so a view can skip
+    re-rendering on ignored input. Each submitted attempt is scored once and its
+    pattern code kept in ``patterns``.
+
+    In adversarial mode the target is never fixed: each guess keeps the largest
+    group of remaining candidates that share a pattern, and ``current_word`` is
+    just one word of that group. This needs ``candidates``.
+
+    In hard mode every guess must fit the feedback so far. While hard mode is on
+    ``constraints`` is updated on every submit (and rebuilt from ``patterns``
+    when it is switched on mid-game), so the current guess is re-checked in
+    O(word length) per keystroke and ``hard_violation`` says why it cannot be
+    submitted. Hard mode applies to single-board games.
+
+    With ``board_count`` > 1 every guess is scored against all unsolved targets
+    in one batched call. Each board keeps its own patterns and candidates; board
+    0 is also exposed as ``current_word``, ``patterns`` and ``candidates``.
+    """
+
+    __slots__ = (
+        "words_by_length",
+        "word_length",
+        "max_attempts",
+        "current_word",
+        "current_guess",
+        "attempts",
+        "patterns",
+        "game_won",
+        "game_over",
+        "game_started",
+        "game_paused",
+        "adversarial",
+        "hard_mode",
+        "constraints",
+        "hard_violation",
+        "letter_states",
+        "board_count",
+        "targets",
+        "board_patterns",
+        "board_candidates",
+        "solved_at",
+        "_target_letters",
+        "_target_rows",
+        "candidates",
+        "feedback_matrix",
+        "samplers",
+        "valid_guesses",
+        "rejected_guess",
+        "rng",
+    )
+
+    def __init__(self, words_by_length: Optional[Dict] = None, word_length: int = 5,
+                 max_attempts: int = 6, rng: Optional[random.Random] = None):
+        self.words_by_length = words_by_length if words_by_length is not None else {}
+        self.word_length = word_length
+        self.max_attempts = max_attempts
+        self.current_word = ""
+        self.current_guess = ""
+        self.attempts: List[str] = []
+        self.patterns: List[int] = []
+        self.game_won = False
+        self.game_over = False
+        self.game_started = False
+        self.game_paused = False
+        self.adversarial = False
+        self.hard_mode = False
+        self.constraints = Constraints(word_length)
+        self.hard_violation = ""
+        # Best-known feedback state per letter a-z, updated once per submitted guess
+        self.letter_states: List[int] = [UNKNOWN] * 26
+        self.board_count = 1
+        self.targets: List[str] = []
+        self.board_patterns: List[List[int]] = [self.patterns]
+        self.board_candidates: List = []
+        # Attempt index that solved each board, or None while unsolved
+        self.solved_at: List[Optional[int]] = []
+        self._target_letters = None
+        self._target_rows = None
+        # Optional CandidateSet / FeedbackMatrix, attached by whoever loaded the words
+        self.candidates = None
+        self.feedback_matrix = None
+        # Optional per-length target samplers (anything with draw(rng)); without one
+        # targets are drawn uniformly
+        self.samplers: Dict[int, object] = {}
+        # Optional allowed-guess lexicon (anything supporting `in`); None accepts any word
+        self.valid_guesses = None
+        self.rejected_guess = ""
+        self.rng = rng if rng is not None else random.Random()
+
+    def get_random_word(self, length: int = 5) -> str:
+        """Get a random word of the given length; with a lexicon attached, one it accepts if possible"""
+        word = self._draw_word(length)
+        if self.valid_guesses is not None and length == self.word_length:
+            # The answer list keeps wordfreq's odd entries; valid-words games skip them
+            for _ in range(VALID_TARGET_TRIES):
+                if word in self.valid_guesses:
+                    break
+                word = self._draw_word(length)
+        return word
+
+    def _draw_word(self, length: int) -> str:
+        sampler = self.samplers.get(length)
+        if sampler is not None:
+            return sampler.draw(self.rng)
+        store = self.words_by_length.get(length)
+        if store is not None and len(store):
+            return store[self.rng.randrange(len(store))]
+
+        # Fallback: use english_words library to find words of this length
+        candidates = english_words(length)
+        if candidates:
+            return self.rng.choice(candidates)
+
+        # Last resort: a common word of this length
+        return FALLBACK_WORDS_BY_LENGTH.get(length, FALLBACK_WORD)
+
+    def set_word_length(self, length: int) -> bool:
+        """Switch to another word length; a started game is replaced by one of the new length"""
+        if length == self.word_length:
+            return False
+        self.word_length = length
+        if self.game_started:
+            self.start_new_game()
+        else:
+            self.current_guess = ""
+            self.hard_violation = ""
+            self.constraints = Constraints(length)
+        return True
+
+    def set_adversarial(self, adversarial: bool) -> bool:
+        """Switch adversarial mode; a started game is replaced since its target rules changed"""
+        if adversarial == self.adversarial:
+            return False
+        self.adversarial = adversarial
+        if self.game_started:
+            self.start_new_game()
+        return True
+
+    def set_board_count(self, board_count: int) -> bool:
+        """Switch how many targets are played at once; a started game is replaced"""
+        if board_count == self.board_count or board_count < 1:
+            return False
+        self.board_count = board_count
+        if self.game_started:
+            self.start_new_game()
+        else:
+            self.current_guess = ""
+        return True
+
+    def set_hard_mode(self, hard_mode: bool) -> bool:
+        """Switch hard mode; switching it on mid-game rebuilds the constraints from the guesses so far"""
+        if hard_mode == self.hard_mode:
+            return False
+        self.hard_mode = hard_mode
+        if hard_mode:
+            # Not maintained while hard mode is off: O(attempts x length) once here
+            # keeps every normal submit free of it
+            self.constraints = Constraints(self.word_length)
+            for attempt, code in zip(self.attempts, self.patterns):
+                self.constraints.update(attempt, feedback.decode_pattern(code, self.word_length))
+        self._check_hard_mode()
+        return True
+
+    def _check_hard_mode(self):
+        # O(word length): one pass over the current guess against the constraint summary
+        if self.hard_mode and self.board_count == 1:
+            self.hard_violation = self.constraints.check(self.current_guess)
+        else:
+            self.hard_violation = ""
+
+    def attempt_limit(self) -> int:
+        """Guesses allowed this game: one extra per additional board (9 for 4, 13 for 8, 21 for 16)"""
+        return self.max_attempts + self.board_count - 1
+
+    def accepting_input(self) -> bool:
+        return self.game_started and not self.game_paused and not self.game_over
+
+    def start_new_game(self, word: Optional[str] = None):
+        """Start a new game, with random targets unless the (first) one is given"""
+        targets = [word if word is not None else self.get_random_word(self.word_length)]
+        for _ in range(100 * self.board_count):
+            if len(targets) >= self.board_count:
+                break
+            target = self.get_random_word(self.word_length)
+            if target not in targets:
+                targets.append(target)
+        # A tiny fallback list may not have enough distinct words
+        while len(targets) < self.board_count:
+            targets.append(self.get_random_word(self.word_length))
+        self.targets = targets
+        self.current_word = targets[0]
+        self.current_guess = ""
+        self.attempts = []
+        self.board_patterns = [[] for _ in targets]
+        self.patterns = self.board_patterns[0]
+        self.solved_at = [None] * len(targets)
+        self._target_letters = None
+        self._target_rows = None
+        self.rejected_guess = ""
+        self.hard_violation = ""
+        self.constraints = Constraints(self.word_length)
+        self.letter_states = [UNKNOWN] * 26
+        self.game_won = False
+        self.game_over = False
+        if self.candidates is not None:
+            self.candidates.reset()
+            self.board_candidates = [self.candidates] + [self.candidates.copy() for _ in targets[1:]]
+        else:
+            self.board_candidates = []
+
+    def add_letter(self, letter: str) -> bool:
+        """Add a letter to current guess"""
+        if len(self.current_guess) < self.word_length and self.accepting_input():
+            self.current_guess += letter.lower()
+            self.rejected_guess = ""
+            self._check_hard_mode()
+            return True
+        return False
+
+    def remove_letter(self) -> bool:
+        """Remove last letter from current guess"""
+        if self.current_guess and self.accepting_input():
+            self.current_guess = self.current_guess[:-1]
+            self.rejected_guess = ""
+            self._check_hard_mode()
+            return True
+        return False
+
+    @metrics.timed("engine.submit_guess")
+    def submit_guess(self) -> bool:
+        """Submit current guess; words outside the lexicon (valid-guess mode) or breaking hard mode are rejected"""
+        if len(self.current_guess) != self.word_length or not self.accepting_input():
+            return False
+        guess = self.current_guess
+        if self.hard_violation:
+            # The view already shows why; keep the letters so the player can fix them
+            return False
+        # A target is always accepted, even one drawn before valid-words mode was switched on
+        if self.valid_guesses is not None and guess not in self.valid_guesses and guess not in self.targets:
+            # Keep the letters so the player can fix the word; True tells the view to re-render
+            self.rejected_guess = guess
+            return True
+        self.rejected_guess = ""
+        if self.board_count > 1:
+            self._score_boards(guess)
+        elif self.adversarial and self.candidates is not None and len(self.candidates):
+            # Dodge the guess: any word of the surviving group explains every pattern so far
+            code = self.candidates.narrow_to_largest(guess, self.feedback_matrix)
+            self.current_word = self.targets[0] = self.candidates.store[int(self.candidates.indices[0])]
+        else:
+            code = feedback.score(guess, self.current_word)
+            # Narrow the remaining candidates by this guess only, not by every attempt
+            if self.candidates is not None:
+                self.candidates.narrow(guess, code, self.feedback_matrix)
+        if self.board_count == 1:
+            self.patterns.append(code)
+            states = feedback.decode_pattern(code, self.word_length)
+            self._update_letter_states(guess, states)
+            if self.hard_mode:
+                self.constraints.update(guess, states)
+        if guess == self.current_word and self.solved_at[0] is None:
+            self.solved_at[0] = len(self.attempts)
+        self.attempts.append(guess)
+        self.current_guess = ""
+
+        # Check game state
+        if all(at is not None for at in self.solved_at):
+            self.game_won = True
+            self.game_over = True
+        elif len(self.attempts) >= self.attempt_limit():
+            self.game_over = True
+        return True
+
+    def _board_codes(self, guess: str) -> List[int]:
+        # Pattern of the guess against every target in one batched call: a single
+        # gather from the feedback matrix when all words are in it, else score_batch
+        matrix = self.feedback_matrix
+        if matrix is not None:
+            g = matrix.store.index_of(guess)
+            if g is not None:
+                if self._target_rows is None or self._target_rows[0] is not matrix:
+                    self._target_rows = (matrix, [matrix.store.index_of(t) for t in self.targets])
+                rows = self._target_rows[1]
+                if None not in rows:
+                    return matrix.codes[g, rows].tolist()
+        if self._target_letters is None:
+            self._target_letters = feedback.encode_words(self.targets)
+        return feedback.score_batch(guess, self._target_letters).tolist()
+
+    def _score_boards(self, guess: str):
+        # Solved boards stop taking rows
+        codes = self._board_codes(guess)
+        for board, code in enumerate(codes):
+            if self.solved_at[board] is not None:
+                continue
+            self.board_patterns[board].append(code)
+            self._update_letter_states(guess, feedback.decode_pattern(code, self.word_length))
+            if self.board_candidates:
+                self.board_candidates[board].narrow(guess, code, self.feedback_matrix)
+            if guess == self.targets[board]:
+                self.solved_at[board] = len(self.attempts)
+
+    def _update_letter_states(self, guess: str, pattern: List[int]):
+        # A letter's state only ever improves: absent < present < correct
+        states = self.letter_states
+        for ch, state in zip(guess, pattern):
+            i = ord(ch) - 97
+            if state > states[i]:
+                states[i] = state
+
+    def letter_state(self, letter: str) -> int:
+        """Best-known feedback state of a letter, or UNKNOWN"""
+        return self.letter_states[ord(letter) - 97]
+
+    def unsolved_boards(self) -> List[int]:
+        return [board for board, at in enumerate(self.solved_at) if at is None]
+
+    def active_candidates(self):
+        """Candidates of the first unsolved board (board 0 in a single-board game)"""
+        for board in self.unsolved_boards():
+            if board < len(self.board_candidates):
+                return self.board_candidates[board]
+        return self.candidates
+
+    def attach_candidates(self, candidates):
+        """Use a fresh CandidateSet for this game's words, replaying every board's feedback so far"""
+        self.candidates = candidates
+        self.board_candidates = [candidates] + [candidates.copy() for _ in self.board_patterns[1:]]
+        for board_set, patterns in zip(self.board_candidates, self.board_patterns):
+            for attempt, code in zip(self.attempts, patterns):
+                board_set.narrow(attempt, code)
+
+    def guess(self, word: str) -> Optional[int]:
+        """Type and submit a whole word; returns its pattern code, or None if it was rejected"""
+        if len(word) != self.word_length or not self.accepting_input():
+            return None
+        attempts = len(self.attempts)
+        self.current_guess = word.lower()
+        self._check_hard_mode()
+        self.submit_guess()
+        if len(self.attempts) == attempts:
+            self.current_guess = ""
+            self.hard_violation = ""
+            return None
+        return self.patterns[-1]
+
+    def begin(self) -> bool:
+        """Start or restart the game and enable inputs"""
+        if not self.game_started or self.game_over:
+            self.start_new_game()
+        self.game_started = True
+        self.game_paused = False
+        return True
+
+    def pause(self) -> bool:
+        """Toggle pause state if game is started and not over"""
+        if not self.game_started or self.game_over:
+            return False
+        self.game_paused = not self.game_paused
+        return True
+
+    def end(self) -> bool:
+        """End the game immediately"""
+        if not self.game_started or self.game_over:
+            return False
+        self.game_over = True
+        return True
+
+    def play_again(self):
+        """Start a new game straight away"""
+        self.start_new_game()
+        self.game_started = True
+        self.game_paused = False
@@ -0,0 +1,63 @@
+"""Hard-mode rules: every guess must be consistent with the feedback revealed so far.
+
+Constraints is a compact summary of that feedback, updated once per scored
+guess while hard mode is on, so checking a guess as it is typed costs O(word length) no matter how
+many attempts have been made.
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+import feedback
+
+
+class Constraints:
+    """Fixed positions, minimum letter counts, banned letters and banned positions"""
+
+    __slots__ = ("length", "fixed", "min_counts", "banned", "banned_at")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.reset()
+
+    def reset(self):
+        self.fixed: List[Optional[str]] = [None] * self.length
+        self.min_counts: Dict[str, int] = {}
+        self.banned: Set[str] = set()
+        self.banned_at: List[Set[str]] = [set() for _ in range(self.length)]
+
+    def update(self, guess: str, states: List[int]):
+        """Fold the feedback of one scored guess (its decoded pattern) into the constraints"""
+        found = Counter()
+        for ch, state in zip(guess, states):
+            if state != feedback.ABSENT:
+                found[ch] += 1
+        for i, (ch, state) in enumerate(zip(guess, states)):
+            if state == feedback.CORRECT:
+                self.fixed[i] = ch
+            else:
+                # Yellow, or grey beside another copy of the letter: not here
+                self.banned_at[i].add(ch)
+                if state == feedback.ABSENT and not found[ch] and not self.min_counts.get(ch):
+                    self.banned.add(ch)
+        for ch, count in found.items():
+            if count > self.min_counts.get(ch, 0):
+                self.min_counts[ch] = count
+
+    def check(self, guess: str) -> str:
+        """Why a (possibly partial) guess breaks hard mode, or "" if it can still be valid"""
+        for i, ch in enumerate(guess):
+            fixed = self.fixed[i]
+            if fixed is not None and ch != fixed:
+                return f"Letter {i + 1} must be {fixed.upper()}"
+            if ch in self.banned:
+                return f"{ch.upper()} is not in the word"
+            if ch in self.banned_at[i]:
+                return f"{ch.upper()} cannot be letter {i + 1}"
+        if self.min_counts:
+            counts = Counter(guess)
+            missing = [ch for ch, n in self.min_counts.items() if counts[ch] < n]
+            needed = sum(self.min_counts[ch] - counts[ch] for ch in missing)
+            # Only a violation once the open slots can no longer fit the missing letters
+            if needed > self.length - len(guess):
+                return f"Guess must contain {missing[0].upper()}"
+        return ""
@@ -0,0 +1,283 @@
+"""Opt-in hot-path metrics and a sampling profiler for live sessions.
+
+Disabled by default; enable with ``python word_game.py --metrics`` or
+WORD_GAME_METRICS=1. Timed sections feed latency histograms with power-of-two
+buckets, and render sizes feed count histograms. Both are exported as JSON by
+a periodic dump (WORD_GAME_METRICS_FILE) and/or a local HTTP endpoint
+(WORD_GAME_METRICS_PORT):
+
+    GET /metrics              current histograms
+    GET /profile?seconds=5    sampled stacks of every thread, in collapsed
+                              (flame graph) format
+
+When disabled a timed call costs one attribute check.
+"""
+import contextlib
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+METRICS_ENV = "WORD_GAME_METRICS"
+# "{pid}" in the path is replaced, so several server workers do not overwrite each other
+DUMP_ENV = "WORD_GAME_METRICS_FILE"
+DUMP_SECONDS = 10.0
+PORT_ENV = "WORD_GAME_METRICS_PORT"
+# Bucket i counts values up to 2 ** i (microseconds for latencies)
+BUCKET_COUNT = 32
+SAMPLE_SECONDS = 0.005
+MAX_PROFILE_SECONDS = 60.0
+
+
+class Histogram:
+    """Count, total, max and power-of-two buckets of non-negative values"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        # Smallest i with value <= 2 ** i
+        i = (math.ceil(value) - 1).bit_length() if value > 1 else 0
+        self.buckets[min(i, BUCKET_COUNT - 1)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th value"""
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return float(min(2 ** i, self.max))
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": {str(2 ** i): n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+class Metrics:
+    """Named latency and count histograms, shared by everything in the process"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.time()
+        self._latency: Dict[str, Histogram] = {}
+        self._counts: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._exporting = False
+
+    def observe(self, name: str, seconds: float):
+        """Record one latency"""
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._latency.get(name)
+            if hist is None:
+                hist = self._latency[name] = Histogram()
+            hist.add(seconds * 1e6)
+
+    def count(self, name: str, value: int):
+        """Record one size, e.g. the number of controls a render pushed"""
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._counts.get(name)
+            if hist is None:
+                hist = self._counts[name] = Histogram()
+            hist.add(value)
+
+    def timed(self, name: str):
+        """Decorator recording each call's latency under ``name`` while enabled"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        """Context manager recording the latency of a block under ``name`` while enabled"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "uptime_seconds": time.time() - self.started_at,
+                "latency_us": {name: h.summary() for name, h in sorted(self._latency.items())},
+                "counts": {name: h.summary() for name, h in sorted(self._counts.items())},
+            }
+
+    def dump(self, path: str):
+        """Write the snapshot as JSON, replacing the file atomically"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(tmp, path)
+
+    def start(self):
+        """Enable collection and exporters if the environment asks for them (once per process)"""
+        with self._lock:
+            if self._exporting or not os.environ.get(METRICS_ENV):
+                return
+            self._exporting = True
+        self.enabled = True
+        path = os.environ.get(DUMP_ENV)
+        if path:
+            path = path.replace("{pid}", str(os.getpid()))
+            threading.Thread(target=self._dump_loop, args=(path,), daemon=True).start()
+        port = os.environ.get(PORT_ENV)
+        if port:
+            serve(self, int(port))
+
+    def _dump_loop(self, path: str):
+        while True:
+            time.sleep(DUMP_SECONDS)
+            try:
+                self.dump(path)
+            except OSError:
+                pass
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread (UI, render tasks, loaders, hint workers).
+
+    cProfile only sees the thread that enabled it, and the game's work is spread
+    over several, so this polls ``sys._current_frames`` instead.
+    """
+
+    def __init__(self, interval: float = SAMPLE_SECONDS):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the stacks in collapsed format"""
+        if self.running:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.collapsed()
+
+    def _run(self, stop: threading.Event):
+        me = threading.get_ident()
+        names = {}
+        while not stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                frames.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def save(self, directory: str = ".") -> str:
+        """Write the collapsed stacks to a timestamped file and return its path"""
+        path = os.path.join(directory, time.strftime("profile-%Y%m%d-%H%M%S.txt"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
+
+
+def serve(metrics: Metrics, port: int):
+    """Serve /metrics and /profile on localhost in a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/metrics":
+                body, kind = json.dumps(metrics.snapshot(), indent=1), "application/json"
+            elif url.path == "/profile":
+                try:
+                    seconds = float(parse_qs(url.query).get("seconds", ["5"])[0])
+                except ValueError:
+                    seconds = 5.0
+                profiler = SamplingProfiler()
+                profiler.start()
+                time.sleep(max(0.0, min(seconds, MAX_PROFILE_SECONDS)))
+                body, kind = profiler.stop(), "text/plain"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    except OSError as e:
+        # Another process (e.g. a sibling server worker) has the port; the dump still works
+        print(f"metrics endpoint not started on port {port}: {e}", file=sys.stderr)
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+metrics = Metrics()
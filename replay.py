@@ -0,0 +1,197 @@
+"""Replay recorded sessions against the headless GameEngine, as fast as possible.
+
+Every logged action is applied in order, as the view applied it, with the
+logged targets fed back in place of fresh draws. The outcome of each game is
+checked against the result the live session logged, so a set of production
+logs doubles as a regression test for the game's state machine and as a
+realistic benchmark.
+
+    python replay.py logs/*.wgl
+    python replay.py logs/*.wgl --repeat 20 --json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter, deque
+from typing import Dict, List, Mapping, Optional
+
+import event_log
+import feedback_matrix
+import word_index
+from candidates import CandidateSet
+from event_log import Event
+from game_engine import GameEngine
+
+
+class ScriptedSampler:
+    """Hands out the logged targets in order, in place of a TargetSampler"""
+
+    def __init__(self, targets: List[str], engine: GameEngine):
+        self.queue = deque(targets)
+        self.engine = engine
+
+    def draw(self, rng: random.Random) -> str:
+        if self.queue:
+            return self.queue.popleft()
+        # The log ended mid-draw; any word keeps the replay going
+        store = self.engine.words_by_length.get(self.engine.word_length)
+        return store[rng.randrange(len(store))] if store else ""
+
+
+class Replayer:
+    """Applies logged events to one engine, with the word data loaded once for every log"""
+
+    def __init__(self, words_by_length: Mapping):
+        self.words_by_length = words_by_length
+        self._matrices: Dict[int, object] = {}
+        self._lexicons: Dict[int, object] = {}
+
+    def matrix(self, length: int):
+        if length not in self._matrices:
+            store = self.words_by_length.get(length)
+            self._matrices[length] = feedback_matrix.load(store) if store is not None else None
+        return self._matrices[length]
+
+    def lexicon(self, length: int):
+        if length not in self._lexicons:
+            store = self.words_by_length.get(length)
+            self._lexicons[length] = word_index.load_lexicon(store) if store is not None else None
+        return self._lexicons[length]
+
+    def use_length(self, engine: GameEngine, valid_words: bool):
+        # As WordGuessingGame.use_length once the words have loaded
+        store = self.words_by_length.get(engine.word_length)
+        if store is None:
+            engine.candidates = None
+            return
+        engine.attach_candidates(CandidateSet(store))
+        engine.feedback_matrix = self.matrix(engine.word_length)
+        engine.valid_guesses = self.lexicon(engine.word_length) if valid_words else None
+
+    def replay(self, events: List[Event]) -> Dict:
+        """Run one session's events; returns counts and each game's logged vs replayed outcome"""
+        engine = GameEngine(self.words_by_length)
+        targets = [word for e in events if e.kind == event_log.TARGETS for word in e.value]
+        sampler = ScriptedSampler(targets, engine)
+        engine.samplers = {length: sampler for length in range(1, 32)}
+        valid_words = False
+        self.use_length(engine, valid_words)
+        games = mismatches = 0
+        first_mismatch = None
+        for i, (kind, _, value) in enumerate(events):
+            if kind == event_log.LETTER:
+                engine.add_letter(value)
+            elif kind == event_log.ENTER:
+                engine.submit_guess()
+            elif kind == event_log.BACKSPACE:
+                engine.remove_letter()
+            elif kind == event_log.BEGIN:
+                engine.begin()
+            elif kind == event_log.PAUSE:
+                engine.pause()
+            elif kind == event_log.END:
+                engine.end()
+            elif kind == event_log.PLAY_AGAIN:
+                engine.play_again()
+            elif kind == event_log.RESULT:
+                games += 1
+                if value != (engine.game_won, len(engine.attempts)) or not engine.game_over:
+                    mismatches += 1
+                    if first_mismatch is None:
+                        first_mismatch = i
+            elif kind == event_log.SEED:
+                engine.rng = random.Random(value)
+            elif kind == event_log.LENGTH:
+                if engine.set_word_length(value):
+                    self.use_length(engine, valid_words)
+            elif kind == event_log.BOARDS:
+                engine.set_board_count(value)
+            elif kind == event_log.ADVERSARIAL:
+                engine.set_adversarial(bool(value))
+            elif kind == event_log.HARD_MODE:
+                engine.set_hard_mode(bool(value))
+            elif kind == event_log.VALID_WORDS:
+                valid_words = bool(value)
+                engine.valid_guesses = self.lexicon(engine.word_length) if valid_words else None
+        return {"events": len(events), "games": games, "mismatches": mismatches, "first_mismatch": first_mismatch}
+
+
+def run(paths: List[str], repeat: int = 1, words_by_length: Optional[Mapping] = None) -> Dict:
+    """Replay every log ``repeat`` times and aggregate throughput and mismatches"""
+    if words_by_length is None:
+        words_by_length = word_index.load_index()
+    replayer = Replayer(words_by_length)
+    index_key = getattr(words_by_length, "key", "")
+    logs = []
+    warnings = []
+    for path in paths:
+        header, events = event_log.read(path)
+        if header["index_key"] and index_key and header["index_key"] != index_key:
+            warnings.append(f"{path}: recorded with another word list; outcomes may differ")
+        logs.append((path, events))
+
+    kinds = Counter(event.kind for _, events in logs for event in events)
+    recorded_seconds = sum(event.ms for _, events in logs for event in events) / 1000
+    # Map every length's data before timing, so the numbers are the engine's
+    for _, events in logs:
+        replayer.replay(events)
+
+    games = mismatches = 0
+    failed: Dict[str, int] = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path, events in logs:
+            result = replayer.replay(events)
+            games += result["games"]
+            mismatches += result["mismatches"]
+            if result["mismatches"]:
+                failed.setdefault(path, result["first_mismatch"])
+    elapsed = time.perf_counter() - start
+    events_total = sum(kinds.values()) * repeat
+    return {
+        "logs": len(logs),
+        "repeat": repeat,
+        "events": events_total,
+        "games": games,
+        "mismatches": mismatches,
+        "failed": [f"{path} (first at event {i})" for path, i in failed.items()],
+        "warnings": warnings,
+        "seconds": elapsed,
+        "events_per_sec": events_total / elapsed if elapsed else 0.0,
+        "games_per_sec": games / elapsed if elapsed else 0.0,
+        # Wall-clock time the sessions took live, against the time to replay them once
+        "speedup": recorded_seconds * repeat / elapsed if elapsed else 0.0,
+        "event_kinds": {event_log.KIND_NAMES.get(k, str(k)): n for k, n in sorted(kinds.items())},
+    }
+
+
+def format_report(result: Dict) -> str:
+    lines = [
+        f"logs          {result['logs']} x {result['repeat']}",
+        f"events        {result['events']} in {result['seconds']:.3f}s ({result['events_per_sec']:.0f}/s)",
+        f"games         {result['games']} ({result['games_per_sec']:.0f}/s)",
+        f"speedup       {result['speedup']:.0f}x real time",
+        f"mismatches    {result['mismatches']}",
+    ]
+    lines.extend(f"  {path}" for path in result["failed"])
+    lines.extend(f"warning: {w}" for w in result["warnings"])
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded game sessions and check their outcomes.")
+    parser.add_argument("logs", nargs="+", help="session logs (.wgl)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay every log this many times")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.logs, max(1, args.repeat))
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+    # Non-zero when a replayed game ended differently from the live one
+    return 1 if result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Hosted mode: serve the game to many concurrent browser sessions.
+
+    python server.py --port 8550 --workers 4
+
+Every session gets its own light WordGuessingGame. The word index, feedback
+matrices, lexicons, samplers and hint solvers come from one WordResources per
+process and are only read. The caches are built once in this process before the
+uvicorn workers start, so workers only memory-map them and share their pages.
+A browser session lives on one websocket, so it stays on one worker. Needs the
+flet-web package (FastAPI and uvicorn).
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+import flet as ft
+
+from word_game import WordGuessingGame
+from word_resources import WORD_LENGTHS, shared_resources
+
+# Word lengths whose data is loaded before the first session; set by main() for workers
+PREWARM_ENV = "WORD_GAME_PREWARM_LENGTHS"
+
+
+def session(page: ft.Page):
+    game = WordGuessingGame(shared_resources())
+    game.create_ui(page)
+
+
+def prewarm_lengths() -> List[int]:
+    default = ",".join(str(n) for n in WORD_LENGTHS)
+    return [int(n) for n in os.environ.get(PREWARM_ENV, default).split(",") if n]
+
+
+def asgi_app():
+    """ASGI app for one worker process (``uvicorn server:asgi_app --factory``)"""
+    resources = shared_resources()
+    # main() built every cache before forking; workers only map them
+    resources.build_matrices = False
+    resources.prewarm(prewarm_lengths())
+    return ft.run(session, export_asgi_app=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the word guessing game to browser sessions.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8550)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--lengths", default=",".join(str(n) for n in WORD_LENGTHS),
+                        help="comma-separated word lengths to load before serving (default: all)")
+    args = parser.parse_args(argv)
+
+    os.environ[PREWARM_ENV] = args.lengths
+    # Regenerate stale caches here, once, instead of racing in every worker
+    shared_resources().prewarm(prewarm_lengths())
+
+    import uvicorn
+    uvicorn.run("server:asgi_app", factory=True, host=args.host, port=args.port,
+                workers=args.workers or os.cpu_count() or 1, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Play many games automatically and report throughput.
+
+Targets are drawn with GameEngine.get_random_word through a frequency-weighted
+TargetSampler (its no-repeat bag kept in memory) and guesses come from a
+pluggable strategy. Games are split across a process pool; every worker maps
+the same word index and feedback matrix.
+
+    python simulate.py --games 20000 --strategy frequency
+    python simulate.py --games 500 --strategy solver --workers 4 --json
+    python simulate.py --games 5000 --length 7
+    python simulate.py --games 2000 --adversarial
+    python simulate.py --games 2000 --boards 16
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import feedback_matrix
+import word_index
+from candidates import CandidateSet
+from game_engine import GameEngine
+from target_sampler import FREQUENCY_EXPONENT, TargetSampler
+
+
+class RandomStrategy:
+    """Uniformly random word among the remaining candidates"""
+
+    name = "random"
+
+    def __init__(self, store, rng: random.Random):
+        self.store = store
+        self.rng = rng
+
+    def next_guess(self, engine: GameEngine) -> str:
+        indices = engine.active_candidates().indices
+        if not len(indices):
+            return self.store[self.rng.randrange(len(self.store))]
+        return self.store[int(indices[self.rng.randrange(len(indices))])]
+
+
+class FrequencyStrategy:
+    """Most common word among the remaining candidates"""
+
+    name = "frequency"
+
+    def __init__(self, store, rng: random.Random):
+        self.store = store
+        self.freqs = np.asarray(store.freqs)
+
+    def next_guess(self, engine: GameEngine) -> str:
+        indices = engine.active_candidates().indices
+        if not len(indices):
+            return self.store[0]
+        return self.store[int(indices[np.argmax(self.freqs[indices])])]
+
+
+class SolverStrategy:
+    """Highest expected information, as suggested by the Hint button"""
+
+    name = "solver"
+
+    def __init__(self, store, rng: random.Random, matrix=None):
+        from solver import Solver
+        self.solver = Solver(store, workers=1)
+        self.solver.matrix = matrix
+
+    def next_guess(self, engine: GameEngine) -> str:
+        suggestions = self.solver.suggest(engine.active_candidates().indices, top=1)
+        return suggestions[0][0] if suggestions else engine.targets[engine.unsolved_boards()[0]]
+
+
+STRATEGIES = {cls.name: cls for cls in (RandomStrategy, FrequencyStrategy, SolverStrategy)}
+
+
+def play_games(n_games: int, strategy_name: str, seed: int, max_attempts: int = 6,
+               length: int = 5, weighting: float = FREQUENCY_EXPONENT, adversarial: bool = False,
+               boards: int = 1) -> Dict:
+    """Play n_games in this process and return raw counts and per-stage timings"""
+    timings = Counter()
+    start = time.perf_counter()
+    words_by_length = word_index.load_index()
+    store = words_by_length[length]
+    timings["load_words"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = feedback_matrix.load(store)
+    rng = random.Random(seed)
+    engine = GameEngine(words_by_length, word_length=length, max_attempts=max_attempts, rng=rng)
+    engine.candidates = CandidateSet(store)
+    engine.feedback_matrix = matrix
+    engine.samplers[length] = TargetSampler(store, weighting)
+    engine.adversarial = adversarial
+    engine.board_count = boards
+    if strategy_name == "solver":
+        strategy = SolverStrategy(store, rng, matrix)
+        strategy.solver.opening()
+    else:
+        strategy = STRATEGIES[strategy_name](store, rng)
+    timings["setup"] += time.perf_counter() - start
+
+    guesses_to_solve = Counter()
+    wins = 0
+    clock = time.perf_counter
+    for _ in range(n_games):
+        t0 = clock()
+        engine.play_again()
+        t1 = clock()
+        timings["draw_target"] += t1 - t0
+        while not engine.game_over:
+            t0 = clock()
+            word = strategy.next_guess(engine)
+            t1 = clock()
+            engine.guess(word)
+            t2 = clock()
+            timings["choose_guess"] += t1 - t0
+            timings["submit_guess"] += t2 - t1
+        if engine.game_won:
+            wins += 1
+            guesses_to_solve[len(engine.attempts)] += 1
+    return {"games": n_games, "wins": wins, "distribution": dict(guesses_to_solve), "timings": dict(timings)}
+
+
+def run(n_games: int, strategy_name: str, workers: Optional[int] = None, seed: int = 0,
+        max_attempts: int = 6, length: int = 5, weighting: float = FREQUENCY_EXPONENT,
+        adversarial: bool = False, boards: int = 1) -> Dict:
+    """Spread n_games over a process pool and aggregate the results"""
+    workers = max(1, min(workers or os.cpu_count() or 1, n_games))
+    # Build shared caches once up front so workers only ever map them
+    store = word_index.load_index()[length]
+    feedback_matrix.load_or_build(store)
+
+    sizes = [n_games // workers + (1 if i < n_games % workers else 0) for i in range(workers)]
+    start = time.perf_counter()
+    if workers == 1:
+        parts = [play_games(n_games, strategy_name, seed, max_attempts, length, weighting, adversarial, boards)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(play_games, size, strategy_name, seed + i, max_attempts, length, weighting,
+                                   adversarial, boards)
+                       for i, size in enumerate(sizes) if size]
+            parts = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    distribution = Counter()
+    timings = Counter()
+    wins = 0
+    for part in parts:
+        wins += part["wins"]
+        distribution.update({int(k): v for k, v in part["distribution"].items()})
+        timings.update(part["timings"])
+    solved = sum(distribution.values())
+    return {
+        "strategy": strategy_name,
+        "length": length,
+        "weighting": weighting,
+        "adversarial": adversarial,
+        "boards": boards,
+        "games": n_games,
+        "workers": workers,
+        "seconds": elapsed,
+        "games_per_sec": n_games / elapsed if elapsed else 0.0,
+        "win_rate": wins / n_games if n_games else 0.0,
+        "mean_guesses": sum(k * v for k, v in distribution.items()) / solved if solved else 0.0,
+        "distribution": {k: distribution[k] for k in sorted(distribution)},
+        # Summed across workers, so stages can be compared with each other
+        "timings": {k: timings[k] for k in sorted(timings)},
+    }
+
+
+def format_report(result: Dict) -> str:
+    lines = [
+        f"strategy      {result['strategy']}{' (adversarial)' if result['adversarial'] else ''}",
+        f"word length   {result['length']}",
+        f"boards        {result['boards']}",
+        f"weighting     frequency ** {result['weighting']:g}",
+        f"games         {result['games']} on {result['workers']} worker(s) in {result['seconds']:.2f}s",
+        f"games/sec     {result['games_per_sec']:.0f}",
+        f"win rate      {result['win_rate']:.1%}",
+        f"mean guesses  {result['mean_guesses']:.3f}",
+        "guesses to solve:",
+    ]
+    solved = sum(result["distribution"].values()) or 1
+    for k, v in result["distribution"].items():
+        lines.append(f"  {k}: {v:>8}  {'#' * round(40 * v / solved)}")
+    lines.append("stage timings (CPU-seconds across workers):")
+    for stage, seconds in result["timings"].items():
+        lines.append(f"  {stage:<14} {seconds:9.3f}s")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate word guessing games and report throughput.")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="frequency")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="base RNG seed; worker i uses seed + i")
+    parser.add_argument("--max-attempts", type=int, default=6)
+    parser.add_argument("--length", type=int, default=5, choices=range(word_index.MIN_LENGTH, word_index.MAX_LENGTH + 1),
+                        metavar="N", help="word length to play")
+    parser.add_argument("--weighting", type=float, default=FREQUENCY_EXPONENT,
+                        help="target weight is frequency ** WEIGHTING (0 = uniform)")
+    parser.add_argument("--adversarial", action="store_true", help="play against the dodging (Absurdle) target")
+    parser.add_argument("--boards", type=int, default=1, help="targets played at once with every guess")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.games, args.strategy, args.workers, args.seed, args.max_attempts, args.length,
+                 args.weighting, args.adversarial, args.boards)
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
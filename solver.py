@@ -0,0 +1,155 @@
+"""Entropy-based guess suggestions.
+
+Every possible guess is ranked by the expected information (in bits) its
+feedback pattern gives about the remaining candidates, using the same scoring
+rules as the game. The opening ranking scores every word against every word,
+so it is spread across a process pool and cached on disk per word list.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import feedback
+import feedback_matrix
+import word_index
+from word_index import WordStore
+
+# Guesses per worker task; small enough that cancellation takes effect quickly
+CHUNK_SIZE = 256
+
+
+class Cancelled(Exception):
+    """Raised when a suggestion request is cancelled before it finishes"""
+
+
+def entropies(patterns: np.ndarray, length: int) -> np.ndarray:
+    """Expected information in bits of each guess row of a guess x candidate pattern array"""
+    n_guesses, n_candidates = patterns.shape
+    if not n_candidates:
+        return np.zeros(n_guesses)
+    n_patterns = 3 ** length
+    flat = patterns.astype(np.int64) + (np.arange(n_guesses, dtype=np.int64) * n_patterns)[:, None]
+    counts = np.bincount(flat.ravel(), minlength=n_guesses * n_patterns).reshape(n_guesses, n_patterns)
+    p = counts / n_candidates
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+
+def _entropy_chunk(letters: np.ndarray, guesses: np.ndarray, candidates: np.ndarray,
+                   matrix_file: Optional[str]) -> np.ndarray:
+    # Worker: use the shared mmapped matrix when there is one, else score directly
+    if matrix_file is not None:
+        patterns = np.load(matrix_file, mmap_mode="r")[guesses][:, candidates]
+    else:
+        patterns = feedback.score_batch(letters[guesses], letters[candidates])
+    return entropies(patterns, letters.shape[1])
+
+
+class Solver:
+    """Ranks next guesses for a WordStore; work runs in a lazily created process pool"""
+
+    def __init__(self, store: WordStore, words_file: str = word_index.WORDS_FILE,
+                 workers: Optional[int] = None):
+        self.store = store
+        self.words_file = words_file
+        self.workers = workers or os.cpu_count() or 1
+        self.matrix = None
+        self._opening: Optional[np.ndarray] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _opening_path(self) -> str:
+        digest = hashlib.sha1(np.ascontiguousarray(self.store.letters).tobytes()).hexdigest()[:16]
+        return os.path.join(word_index.cache_dir_for(self.words_file),
+                            f"opening_{self.store.length}_{digest}.npy")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _matrix_file(self) -> Optional[str]:
+        if self.matrix is None:
+            return None
+        return feedback_matrix.matrix_path(self.store.length, self.words_file)
+
+    def entropies(self, candidates: np.ndarray, cancel: Optional[threading.Event] = None,
+                  parallel: bool = True) -> np.ndarray:
+        """Entropy of every word in the store as a guess against the given candidate indices"""
+        letters = np.ascontiguousarray(self.store.letters)
+        guesses = np.arange(len(self.store))
+        chunks = [guesses[i:i + CHUNK_SIZE] for i in range(0, len(guesses), CHUNK_SIZE)]
+        matrix_file = self._matrix_file()
+        if not parallel or self.workers == 1:
+            parts = []
+            for chunk in chunks:
+                if cancel is not None and cancel.is_set():
+                    raise Cancelled()
+                parts.append(_entropy_chunk(letters, chunk, candidates, matrix_file))
+            return np.concatenate(parts) if parts else np.zeros(0)
+        pool = self._get_pool()
+        futures = [pool.submit(_entropy_chunk, letters, chunk, candidates, matrix_file) for chunk in chunks]
+        pending = set(futures)
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for future in futures:
+                    future.cancel()
+                raise Cancelled()
+            _, pending = wait(pending, timeout=0.05)
+        return np.concatenate([future.result() for future in futures])
+
+    def opening(self, cancel: Optional[threading.Event] = None) -> np.ndarray:
+        """Entropies against the full list, cached in memory and on disk"""
+        if self._opening is not None:
+            return self._opening
+        path = self._opening_path()
+        try:
+            table = np.load(path)
+            if table.shape == (len(self.store),):
+                self._opening = table
+                return table
+        except (OSError, ValueError):
+            pass
+        table = self.entropies(np.arange(len(self.store)), cancel)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp, table)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        self._opening = table
+        return table
+
+    def suggest(self, candidates: np.ndarray, top: int = 5,
+                cancel: Optional[threading.Event] = None) -> List[Tuple[str, float]]:
+        """Best next guesses as (word, expected bits), most informative first.
+
+        Ties go to guesses that could still be the answer, then to more common words.
+        """
+        n = len(candidates)
+        if n == 0:
+            return []
+        if n <= 2:
+            return [(self.store[int(i)], float(np.log2(n))) for i in candidates[:top]]
+        if n == len(self.store):
+            scores = self.opening(cancel)
+        else:
+            # Later turns have few candidates; spreading them over processes costs more than it saves
+            scores = self.entropies(candidates, cancel, parallel=n * len(self.store) > 4_000_000)
+        is_candidate = np.zeros(len(self.store), dtype=bool)
+        is_candidate[candidates] = True
+        freqs = np.asarray(self.store.freqs)
+        order = np.lexsort((-freqs, ~is_candidate, -np.round(scores, 6)))[:top]
+        return [(self.store[int(i)], float(scores[i])) for i in order]
@@ -0,0 +1,287 @@
+"""Persistent player statistics in a local SQLite database.
+
+Finished games are queued by the UI and written by a background thread in
+batches, one transaction per batch. Every batch also updates small summary
+tables (totals and streaks, the guess distribution and per-word difficulty),
+kept separately for each word length, board count and mode, so the stats
+panel reads a handful of rows however many games were played. Absurdle games
+count towards totals but not word difficulty, since their "target" is just
+the word the adversary ended on.
+The database runs in WAL mode, so reads never wait for the writer.
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import word_index
+
+STATS_FILE = "word_game_stats.db"
+# Write when this many results are queued, or after FLUSH_SECONDS, whichever is first
+BATCH_SIZE = 32
+FLUSH_SECONDS = 2.0
+_TIMEOUT = object()
+
+# Bump with a migration in _migrate whenever the tables change
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    length INTEGER NOT NULL,
+    boards INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    guesses INTEGER NOT NULL,
+    words TEXT NOT NULL,
+    solved TEXT
+);
+CREATE TABLE IF NOT EXISTS totals (
+    length INTEGER NOT NULL,
+    boards INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    played INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    current_streak INTEGER NOT NULL,
+    max_streak INTEGER NOT NULL,
+    PRIMARY KEY (length, boards, mode)
+);
+CREATE TABLE IF NOT EXISTS distribution (
+    length INTEGER NOT NULL,
+    boards INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    guesses INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (length, boards, mode, guesses)
+);
+CREATE TABLE IF NOT EXISTS word_difficulty (
+    word TEXT NOT NULL,
+    boards INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    played INTEGER NOT NULL,
+    solved INTEGER NOT NULL,
+    total_guesses INTEGER NOT NULL,
+    PRIMARY KEY (word, boards, mode)
+);
+"""
+
+
+class GameResult(NamedTuple):
+    """One finished game; ``solved_at`` holds each target's solving guess number or None"""
+    length: int
+    boards: int
+    mode: str
+    won: bool
+    guesses: int
+    targets: List[str]
+    solved_at: List[Optional[int]]
+    finished_at: float
+
+
+def mode_name(adversarial: bool, hard_mode: bool) -> str:
+    """Rules a game was played under; statistics are kept separately for each"""
+    modes = [name for name, on in (("absurdle", adversarial), ("hard", hard_mode)) if on]
+    return "+".join(modes) or "normal"
+
+
+def stats_path(words_file: str = word_index.WORDS_FILE) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(words_file)), STATS_FILE)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent without an fsync per commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        _migrate(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Create the tables, or rebuild version 1's per-length summaries from the games table"""
+    # IMMEDIATE so the writer and reader connections cannot both migrate
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "games" in tables:
+                if "solved" not in {row[1] for row in conn.execute("PRAGMA table_info(games)")}:
+                    conn.execute("ALTER TABLE games ADD COLUMN solved TEXT")
+                for table in ("totals", "distribution", "word_difficulty"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            results = [
+                GameResult(length, boards, mode, bool(won), guesses, words.split(","),
+                           _decode_solved(solved, words.count(",") + 1, bool(won), guesses), finished_at)
+                for finished_at, length, boards, mode, won, guesses, words, solved in conn.execute(
+                    "SELECT finished_at, length, boards, mode, won, guesses, words, solved FROM games ORDER BY id")
+            ]
+            _fold(conn, results)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _encode_solved(solved_at: List[Optional[int]]) -> str:
+    return ",".join("" if at is None else str(at) for at in solved_at)
+
+
+def _decode_solved(text: Optional[str], count: int, won: bool, guesses: int) -> List[Optional[int]]:
+    if text is None:
+        # Recorded before per-target guesses were kept: a win solved every target by the last guess
+        return [guesses if won else None] * count
+    return [int(at) if at else None for at in text.split(",")]
+
+
+def write_batch(conn: sqlite3.Connection, results: List[GameResult]):
+    """Insert results and fold them into the summary tables in one transaction"""
+    with conn:
+        conn.executemany(
+            "INSERT INTO games (finished_at, length, boards, mode, won, guesses, words, solved) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(r.finished_at, r.length, r.boards, r.mode, int(r.won), r.guesses, ",".join(r.targets),
+              _encode_solved(r.solved_at)) for r in results],
+        )
+        _fold(conn, results)
+
+
+def _fold(conn: sqlite3.Connection, results: List[GameResult]):
+    # Summaries are per (length, boards, mode): a 16-board or Absurdle game has
+    # different guess counts and odds than a classic one
+    for r in results:
+        key = (r.length, r.boards, r.mode)
+        row = conn.execute(
+            "SELECT current_streak, max_streak FROM totals WHERE length = ? AND boards = ? AND mode = ?", key
+        ).fetchone()
+        streak, best = row if row else (0, 0)
+        streak = streak + 1 if r.won else 0
+        conn.execute(
+            "INSERT INTO totals (length, boards, mode, played, won, current_streak, max_streak) "
+            "VALUES (?, ?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT(length, boards, mode) DO UPDATE SET played = played + 1, won = won + excluded.won, "
+            "current_streak = excluded.current_streak, max_streak = excluded.max_streak",
+            key + (int(r.won), streak, max(best, streak)),
+        )
+        if r.won:
+            conn.execute(
+                "INSERT INTO distribution (length, boards, mode, guesses, count) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(length, boards, mode, guesses) DO UPDATE SET count = count + 1",
+                key + (r.guesses,),
+            )
+    # An Absurdle target is only the word the game happened to settle on, so it says nothing about the word
+    conn.executemany(
+        "INSERT INTO word_difficulty (word, boards, mode, played, solved, total_guesses) VALUES (?, ?, ?, 1, ?, ?) "
+        "ON CONFLICT(word, boards, mode) DO UPDATE SET played = played + 1, solved = solved + excluded.solved, "
+        "total_guesses = total_guesses + excluded.total_guesses",
+        [(word, r.boards, r.mode, int(at is not None), at if at is not None else r.guesses)
+         for r in results if "absurdle" not in r.mode for word, at in zip(r.targets, r.solved_at)],
+    )
+
+
+class StatsRecorder:
+    """Queues finished games and writes them in batches on a background thread"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or stats_path()
+        self._queue: "queue.Queue" = queue.Queue()
+        # The writer owns its own connection; summary() reads through this one, which
+        # WAL lets run alongside a write
+        self._reader: Optional[sqlite3.Connection] = None
+        self._reader_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, result: GameResult):
+        """Queue a finished game; never blocks on the database"""
+        self._queue.put(result)
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Write everything queued so far now; False if that took longer than timeout"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _writer(self):
+        conn = None
+        batch: List[GameResult] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _TIMEOUT
+            if isinstance(item, GameResult):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + FLUSH_SECONDS
+                if len(batch) < BATCH_SIZE:
+                    continue
+            if batch:
+                try:
+                    if conn is None:
+                        conn = connect(self.path)
+                    write_batch(conn, batch)
+                except sqlite3.Error:
+                    # Statistics are best effort; a locked or broken file must not stop play
+                    pass
+                batch = []
+            deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                if conn is not None:
+                    conn.close()
+                return
+
+    def close(self):
+        """Write whatever is queued and stop the writer"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def summary(self, length: int, boards: int = 1, mode: str = "normal", hardest: int = 5) -> Dict:
+        """Totals, streaks, guess distribution and hardest words for one kind of game"""
+        with self._reader_lock:
+            if self._reader is None:
+                self._reader = connect(self.path)
+            return _summary(self._reader, (length, boards, mode), hardest)
+
+
+def _summary(conn: sqlite3.Connection, key: tuple, hardest: int) -> Dict:
+    length, boards, mode = key
+    row = conn.execute(
+        "SELECT played, won, current_streak, max_streak FROM totals WHERE length = ? AND boards = ? AND mode = ?",
+        key,
+    ).fetchone()
+    played, won, streak, best = row if row else (0, 0, 0, 0)
+    distribution = dict(conn.execute(
+        "SELECT guesses, count FROM distribution WHERE length = ? AND boards = ? AND mode = ? ORDER BY guesses",
+        key,
+    ).fetchall())
+    # Least often solved first, then the most guesses per game
+    words = conn.execute(
+        "SELECT word, played, solved, total_guesses FROM word_difficulty "
+        "WHERE length(word) = ? AND boards = ? AND mode = ? "
+        "ORDER BY 1.0 * solved / played, 1.0 * total_guesses / played DESC LIMIT ?",
+        (length, boards, mode, hardest),
+    ).fetchall()
+    return {
+        "played": played,
+        "won": won,
+        "win_rate": won / played if played else 0.0,
+        "current_streak": streak,
+        "max_streak": best,
+        "distribution": distribution,
+        "hardest": [(word, solved / n, guesses / n) for word, n, solved, guesses in words],
+    }
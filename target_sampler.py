@@ -0,0 +1,161 @@
+"""Frequency-weighted target selection with a persistent no-repeat shuffle bag.
+
+Targets are drawn from an alias table (Vose's method) built once per word list,
+so each draw is O(1) however long the list is. Words already drawn go into a
+"used" bag that is skipped by later draws, across sessions, until enough of the
+weight has been used that the bag refills. The bag is kept next to the word
+index as an append-only file: one "<length> <word>" line per draw and a
+"<length> -" line per refill, so saving a draw is one small append. The file is
+rewritten compactly when a sampler loads it and most of it is history.
+"""
+import os
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import word_index
+from word_index import WordStore
+
+# Weight of a word is frequency ** FREQUENCY_EXPONENT: 0 is uniform, 1 is
+# proportional to how common the word is.
+FREQUENCY_EXPONENT = 0.5
+# Refill the bag once this share of the total weight has been drawn; rejected
+# draws then average at most 1 / (1 - BAG_REFILL_FRACTION) per target.
+BAG_REFILL_FRACTION = 0.5
+BAG_FILE_NAME = "target_bag.txt"
+_REFILL = "-"
+# Compact the bag file on load once it has this many lines more than it needs
+BAG_COMPACT_SLACK = 1000
+
+
+class AliasTable:
+    """O(1) sampling from a fixed discrete distribution"""
+
+    def __init__(self, weights: np.ndarray):
+        n = len(weights)
+        if not n:
+            raise ValueError("AliasTable needs at least one weight")
+        total = float(np.sum(weights))
+        scaled = (np.asarray(weights, dtype=np.float64) * (n / total)).tolist() if total > 0 else [1.0] * n
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftover entries keep probability 1.0 (they are 1.0 up to rounding error).
+        # Plain lists: indexing them is much cheaper than indexing ndarray scalars.
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: random.Random) -> int:
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+def bag_path(words_file: str = word_index.WORDS_FILE) -> str:
+    return os.path.join(word_index.cache_dir_for(words_file), BAG_FILE_NAME)
+
+
+def _read_bags(path: str) -> Tuple[Dict[str, List[str]], int]:
+    """Used words per length (as a string key) and the number of lines read"""
+    bags: Dict[str, List[str]] = {}
+    lines = 0
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2:
+                    # A torn final line from an interrupted append
+                    continue
+                lines += 1
+                length, word = parts
+                if word == _REFILL:
+                    bags[length] = []
+                else:
+                    bags.setdefault(length, []).append(word)
+    except OSError:
+        pass
+    return bags, lines
+
+
+class TargetSampler:
+    """Draws target words of one length by weighted frequency without repeats"""
+
+    def __init__(self, store: WordStore, exponent: float = FREQUENCY_EXPONENT,
+                 path: Optional[str] = None):
+        self.store = store
+        weights = np.asarray(store.freqs, dtype=np.float64) ** exponent
+        self.table = AliasTable(weights)
+        self.weights = weights.tolist()
+        self.total = float(weights.sum())
+        # None keeps the bag in memory only (simulations)
+        self.path = path
+        self.used: set = set()
+        self.used_weight = 0.0
+        self._lock = threading.Lock()
+        if path is not None:
+            bags, lines = _read_bags(path)
+            for word in bags.get(str(store.length), []):
+                i = store.index_of(word)
+                if i is not None and i not in self.used:
+                    self.used.add(i)
+                    self.used_weight += self.weights[i]
+            if self.used_weight >= BAG_REFILL_FRACTION * self.total:
+                self.refill()
+            elif lines > sum(len(bag) for bag in bags.values()) + BAG_COMPACT_SLACK:
+                self.save()
+
+    def refill(self):
+        """Put every word back in the bag"""
+        self.used = set()
+        self.used_weight = 0.0
+        if self.path is not None:
+            self._append(_REFILL)
+
+    def draw(self, rng: random.Random) -> str:
+        """A weighted random word that has not been drawn since the bag was last refilled"""
+        with self._lock:
+            if self.used_weight >= BAG_REFILL_FRACTION * self.total or len(self.used) >= len(self.table):
+                self.refill()
+            i = self.table.draw(rng)
+            while i in self.used:
+                i = self.table.draw(rng)
+            self.used.add(i)
+            self.used_weight += self.weights[i]
+            word = self.store[i]
+            if self.path is not None:
+                self._append(word)
+        return word
+
+    def _append(self, word: str):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{self.store.length} {word}\n")
+        except OSError:
+            # Repeats across sessions are harmless; never fail a game over the bag
+            pass
+
+    def save(self):
+        """Rewrite the bag file compactly: this length's used words, and other lengths' bags as they are"""
+        used = [self.store[i] for i in sorted(self.used)]
+        try:
+            bags, _ = _read_bags(self.path)
+            bags[str(self.store.length)] = used
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(f"{length} {word}\n" for length, bag in sorted(bags.items()) for word in bag)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
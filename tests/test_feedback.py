@@ -0,0 +1,80 @@
+"""feedback's scorers against the original two-pass colouring rules."""
+import random
+from typing import List
+
+import numpy as np
+import pytest
+
+import feedback
+
+# Repeated letters in the guess, the target or both
+PAIRS = [
+    ("speed", "abide"),
+    ("eerie", "there"),
+    ("there", "eerie"),
+    ("geese", "eerie"),
+    ("llama", "hello"),
+    ("hello", "llama"),
+    ("abbey", "kebab"),
+    ("kebab", "abbey"),
+    ("aaaaa", "abaca"),
+    ("mamma", "maxim"),
+    ("crane", "crane"),
+    ("robot", "motor"),
+]
+
+
+def reference(guess: str, target: str) -> List[int]:
+    """The original two-pass rules: greens first, then yellows up to the remaining counts"""
+    states = [feedback.ABSENT] * len(target)
+    remaining = {}
+    for i, (g, t) in enumerate(zip(guess, target)):
+        if g == t:
+            states[i] = feedback.CORRECT
+        else:
+            remaining[t] = remaining.get(t, 0) + 1
+    for i, g in enumerate(guess):
+        if states[i] != feedback.CORRECT and remaining.get(g, 0) > 0:
+            states[i] = feedback.PRESENT
+            remaining[g] -= 1
+    return states
+
+
+@pytest.mark.parametrize("guess,target", PAIRS)
+def test_score_matches_reference(guess, target):
+    assert feedback.decode_pattern(feedback.score(guess, target), len(guess)) == reference(guess, target)
+
+
+def test_known_patterns():
+    absent, present, correct = feedback.ABSENT, feedback.PRESENT, feedback.CORRECT
+    # Only one E of SPEED is yellow: ABIDE has a single E
+    assert reference("speed", "abide") == [absent, absent, present, absent, present]
+    # THERE's second E is green, leaving one E for EERIE's first two letters
+    assert reference("eerie", "there") == [present, absent, present, absent, correct]
+
+
+def test_batch_and_pairs_match_score():
+    rng = random.Random(0)
+    # A small alphabet forces plenty of repeated letters
+    for length in (1, 3, 5, 8, 11):
+        words = ["".join(rng.choice("abcde") for _ in range(length)) for _ in range(60)]
+        if length == 5:
+            words += [w for pair in PAIRS for w in pair]
+        batch = feedback.score_batch(words, words, chunk_elements=97)
+        guesses = [rng.choice(words) for _ in range(200)]
+        targets = [rng.choice(words) for _ in range(200)]
+        pairs = feedback.score_pairs(guesses, targets)
+        for g, guess in enumerate(words):
+            assert batch[g].tolist() == [feedback.score(guess, target) for target in words]
+        assert pairs.tolist() == [feedback.score(g, t) for g, t in zip(guesses, targets)]
+
+
+def test_score_batch_empty():
+    assert feedback.score_batch([], ["crane", "slate"]).shape == (0, 2)
+    assert feedback.score_batch(["crane"], []).shape == (1, 0)
+    assert feedback.score_pairs([], []).shape == (0,)
+
+
+def test_pattern_dtype_fits_every_code():
+    for length in (5, 6, 10, 11, 20, 21, 40):
+        assert int(np.iinfo(feedback.pattern_dtype(length)).max) >= 3 ** length - 1
@@ -1,24 +1,127 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import functools
 import flet as ft
-import random
-import requests
 import os
+import sys
+import random
+import threading
+import event_log
+import feedback
+from game_engine import UNKNOWN, GameEngine
+from metrics import SamplingProfiler, metrics
 from typing import List, Dict, Optional
-try:
-    from english_words import english_words_lower_alpha_set as all_words
-except ImportError:
-    all_words = set()
+
+# NumPy-backed modules (word_index, feedback_matrix, candidates, solver) are imported
+# on the background loading path, so the first paint never waits for them.
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+# Renders are coalesced to at most one per frame
+FRAME_SECONDS = 1 / 60
+
+# Playable word lengths; matches word_index.MIN_LENGTH..MAX_LENGTH without importing it
+WORD_LENGTHS = (5, 6, 7, 8)
+
+# Boards played at once, and the tile size that keeps each layout on screen
+BOARD_COUNTS = (1, 4, 8, 16)
+TILE_SIZES = {1: 50, 4: 32, 8: 26, 16: 22}
+
+# Theme color of an on-screen key by the best-known state of its letter
+KEY_COLORS = {
+    UNKNOWN: "card_bg",
+    feedback.ABSENT: "border",
+    feedback.PRESENT: "warning",
+    feedback.CORRECT: "success",
+}
+
+KEYBOARD_LAYOUT = [
+    "qwertyuiop",
+    "asdfghjkl",
+    "zxcvbnm"
+]
+
+
+class StartupProfile:
+    """Time-to-ready of each startup phase, printed to stderr once the words are loaded.
+
+    Enable with ``python word_game.py --profile-startup`` (or WORD_GAME_PROFILE_STARTUP=1).
+    Times are measured from the start of this module's imports.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases = [("imports", _IMPORT_SECONDS)]
+        self.reported = False
+
+    def mark(self, phase: str):
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter() - _IMPORT_STARTED))
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        lines = ["startup profile (ms since import start):"]
+        previous = 0.0
+        for phase, at in self.phases:
+            lines.append(f"  {phase:<22} {at * 1000:8.1f}  (+{(at - previous) * 1000:.1f})")
+            previous = at
+        print("\n".join(lines), file=sys.stderr)
+
+
+def _engine_state(name: str) -> property:
+    """Expose an engine attribute on the view so game state has a single owner"""
+    return property(
+        lambda self: getattr(self.engine, name),
+        lambda self, value: setattr(self.engine, name, value),
+    )
+
+
+def _engine_locked(method):
+    """Run a view method under engine_lock, so a background word-list swap never lands mid-action"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.engine_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class WordGuessingGame:
-    def __init__(self):
-        self.words_by_length = {}
-        self.current_word = ""
-        self.current_guess = ""
-        self.attempts = []
-        self.max_attempts = 6
-        self.game_won = False
-        self.game_over = False
-        self.word_length = 5
+    """Flet view over a headless GameEngine"""
+
+    words_by_length = _engine_state("words_by_length")
+    current_word = _engine_state("current_word")
+    current_guess = _engine_state("current_guess")
+    attempts = _engine_state("attempts")
+    max_attempts = _engine_state("max_attempts")
+    game_won = _engine_state("game_won")
+    game_over = _engine_state("game_over")
+    word_length = _engine_state("word_length")
+    game_started = _engine_state("game_started")
+    game_paused = _engine_state("game_paused")
+    feedback_matrix = _engine_state("feedback_matrix")
+    candidates = _engine_state("candidates")
+
+    def __init__(self, resources: Optional["WordResources"] = None):
+        self.engine = GameEngine()
+        # Held by every engine action and by use_words while it swaps the word list in
+        # (reentrant: change_length calls use_length)
+        self.engine_lock = threading.RLock()
+        # Shared, read-only word data when hosted; None loads everything per game
+        self.resources = resources
         self.show_keyboard = True
+        self.valid_words_only = False
+        self.solver: Optional["Solver"] = None
+        self.hint_cancel: Optional[threading.Event] = None
+        self.hint_message = ""
+        # Physical-keyboard feedback, e.g. typing a letter that is already ruled out
+        self.key_notice = ""
+        self.words_loading = True
+        # Local player statistics; hosted sessions keep none
+        self.stats: Optional["StatsRecorder"] = None
+        self.profile = StartupProfile(bool(os.environ.get("WORD_GAME_PROFILE_STARTUP")))
         
         # Theme definitions
         self.themes = {
@@ -49,140 +152,237 @@ class WordGuessingGame:
         }
         self.current_theme = "cursor_dark"
         
-        # Game flow state
-        self.game_started = False
-        self.game_paused = False
+        # Last rendered state per persistent control, keyed by id()
+        self._rendered: Dict[int, tuple] = {}
+        # Immutable style objects (borders, button styles) of the current theme, shared
+        # by every control that uses them; cleared only when the theme changes
+        self._styles: Dict[tuple, object] = {}
+        # Letter boxes no longer on screen, by size, reused when the board is rebuilt
+        self._tile_pool: Dict[int, List[ft.Container]] = {}
+        self.key_buttons: Dict[str, ft.Button] = {}
+        self.board_tiles: List[List[List[ft.Container]]] = []
+        self.guess_tiles: List[ft.Container] = []
+        # Frame-coalesced rendering: update_ui only schedules, render() pushes
+        self._render_scheduled = False
+        self._schedule_lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._render_requested_at = 0.0
+        # Session event log for replay.py, opened with the first word list when enabled
+        self.event_log: Optional[event_log.EventLogWriter] = None
+        self._event_log_checked = False
+        self._logged_targets: Optional[List[str]] = None
+        # Set when the page closes, so a feedback matrix build stops early
+        self.matrix_cancel = threading.Event()
+        # Toggled with F9 while metrics are enabled
+        self.profiler: Optional[SamplingProfiler] = None
         
+    @metrics.timed("download_words")
     def download_words(self):
-        """Generate a list of common English words (5-8 letters) using wordfreq, fallback to built-ins."""
-        try:
-            from wordfreq import top_n_list
-            # Get top common English words
-            top_words = top_n_list("en", 50000)
-            common_filtered = []
-            for w in top_words:
-                w = w.lower()
-                if w.isalpha() and 5 <= len(w) <= 8:
-                    common_filtered.append(w)
-            # Deduplicate while preserving order
-            seen = set()
-            deduped = []
-            for w in common_filtered:
-                if w not in seen:
-                    seen.add(w)
-                    deduped.append(w)
-            if not deduped:
-                raise RuntimeError("No words produced from wordfreq")
-            with open("words.txt", "w", encoding="utf-8") as f:
-                f.write("# source: wordfreq top common words 5-8 letters\n")
-                f.write("\n".join(deduped))
-            # print(f"Generated common word list: {len(deduped)} words")
-        except Exception as e:
-            # print(f"Falling back to built-in common words due to: {e}")
-            self.create_fallback_words()
+        """Regenerate the common English word list (5-8 letters) and rebuild the word index cache"""
+        import word_index
+        self.use_words(word_index.build_index())
     
     def create_fallback_words(self):
         """Create a fallback list of common 5-8 letter words if generation fails"""
-        fallback_words = [
-            # 5 letters
-            "about", "after", "again", "below", "bring", "cause", "could", "every", "first", "found",
-            "great", "group", "house", "large", "learn", "never", "other", "place", "right", "small",
-            "sound", "still", "study", "their", "there", "these", "thing", "think", "those", "under",
-            "water", "where", "which", "world", "young",
-            # 6 letters
-            "little", "people", "public", "number", "school", "family", "system", "change", "should", "during",
-            "better", "always", "second", "before", "father", "mother", "others", "street", "market", "friend",
-            # 7 letters
-            "another", "because", "between", "country", "example", "history", "interest", "morning", "nothing", "picture",
-            "program", "service", "through", "without", "womanly", "working", "writing", "student", "teacher", "company",
-            # 8 letters
-            "anything", "building", "children", "decision", "distance", "everyone", "football", "language", "learning", "meeting",
-            "research", "security", "solution", "strength", "training", "treasure", "universe", "whatever", "yourself", "business",
-        ]
-        with open("words.txt", "w", encoding="utf-8") as f:
-            f.write("# source: built-in common words 5-8 letters\n")
-            f.write("\n".join(fallback_words))
+        import word_index
+        word_index.write_fallback_words()
     
+    @metrics.timed("load_words")
     def load_words(self):
-        """Load and organize words (only 5-letter words)"""
+        """Load and organize words (5-8 letters) from the cached word index.
+
+        The index is keyed by word source, wordfreq version and filter rules, so the
+        list is only regenerated when that cache is stale or missing. Each length is a
+        packed, memory-mapped WordStore shared read-only between processes, mapped the
+        first time that length is played.
+        """
+        import word_index
         try:
-            with open("words.txt", "r") as f:
-                words = f.read().splitlines()
-            
-            # Filter words: only 5-letter words
-            for word in words:
-                word = word.strip().lower()
-                if word and not word.startswith('#') and word.isalpha() and len(word) == 5:
-                    if 5 not in self.words_by_length:
-                        self.words_by_length[5] = []
-                    self.words_by_length[5].append(word)
-            
-            # print(f"Loaded {sum(len(words) for words in self.words_by_length.values())} words")
-        except Exception as e:
-            # print(f"Error loading words: {e}")
-            self.create_fallback_words()
-            self.load_words()
+            words_by_length = word_index.load_index()
+        except Exception:
+            words = word_index.FALLBACK_WORDS
+            words_by_length = word_index.pack_by_length(words, word_index.word_frequencies(words, False))
+        self.use_words(words_by_length)
+    
+    @metrics.timed("prepare_words")
+    def prepare_words(self):
+        """Load words off the UI thread, unlocking Begin as soon as any list is playable.
+
+        A fresh cached index is ready in milliseconds. Otherwise the existing words.txt
+        (or the built-in list) is used right away while the full index is rebuilt, and
+        the full list is swapped in when it is done.
+        """
+        import word_index
+        self.profile.mark("word_modules_imported")
+        if self.resources is not None:
+            # Hosted: the process-wide index, never rebuilt or rewritten per session
+            with metrics.timer("shared_index"):
+                words_by_length = self.resources.index()
+            self.use_words(words_by_length)
+            self.words_loading = False
+            self.update_ui()
+            return
+        from stats import StatsRecorder
+        self.stats = StatsRecorder()
+        with metrics.timer("read_current_index"):
+            words_by_length = word_index.read_current_index()
+        if words_by_length is None:
+            with metrics.timer("quick_index"):
+                quick = word_index.quick_index()
+            self.use_words(quick, full=False)
+            self.update_ui()
+            self.profile.mark("words_playable")
+            try:
+                with metrics.timer("build_index"):
+                    words_by_length = word_index.build_index()
+            except Exception:
+                words_by_length = None
+        if words_by_length is not None:
+            self.use_words(words_by_length)
+        self.words_loading = False
+        self.update_ui()
+        self.profile.mark("words_ready")
+        self.profile.report()
+    
+    @metrics.timed("use_words")
+    def use_words(self, words_by_length: Dict, full: bool = True):
+        """Switch to a word index, carrying the current game's candidates over to it.
+
+        Runs on a worker thread: the new candidates and sampler are built first, and
+        only the swap itself holds engine_lock.
+        """
+        from candidates import CandidateSet
+        length = self.word_length
+        store = words_by_length.get(length)
+        if store is None:
+            return
+        # Before words_by_length is set, so no game can begin (and draw) ahead of the seed
+        self.open_event_log(words_by_length)
+        candidates = CandidateSet(store)
+        sampler = self.new_sampler(words_by_length, length)
+        with self.engine_lock:
+            self.words_by_length = words_by_length
+            self.words_loading = not full
+            if self.word_length == length:
+                self.engine.samplers = {length: sampler}
+                self.use_length(candidates)
+            else:
+                # The player switched length meanwhile; build for that one under the lock
+                self.engine.samplers = {}
+                self.use_length()
+        self.load_length_data()
+    
+    def current_store(self):
+        """WordStore for the current word length, mapped on first use"""
+        return self.words_by_length.get(self.word_length)
+    
+    def use_length(self, candidates: Optional["CandidateSet"] = None):
+        """Point candidates at the current length's words; its matrix and lexicon load separately"""
+        from candidates import CandidateSet
+        store = self.current_store()
+        if store is None:
+            self.candidates = None
+            return
+        self.ensure_sampler(self.word_length)
+        if candidates is None or candidates.store is not store:
+            candidates = CandidateSet(store)
+        self.engine.attach_candidates(candidates)
+        self.feedback_matrix = None
+        self.solver = None
+        self.engine.valid_guesses = None
+    
+    def ensure_sampler(self, length: int):
+        """Build the target sampler of a length once per word list; every later draw is O(1)"""
+        if length in self.engine.samplers:
+            return
+        sampler = self.new_sampler(self.words_by_length, length)
+        if sampler is not None:
+            self.engine.samplers[length] = sampler
+
+    def new_sampler(self, words_by_length: Dict, length: int):
+        """Target sampler for one length of a word index, or None if it has no such words"""
+        from target_sampler import TargetSampler, bag_path
+        store = words_by_length.get(length)
+        if store is None:
+            return None
+        if self.resources is not None:
+            return self.resources.sampler(length)
+        return TargetSampler(store, path=bag_path())
+    
+    def load_length_data(self):
+        """Load the lexicon and feedback matrix of the current length (may block; run off the UI thread)"""
+        if self.valid_words_only:
+            self.load_valid_guesses()
+        if not self.words_loading:
+            # A partial list would overwrite the persisted matrix for the full one
+            self.load_feedback_matrix()
+    
+    def load_feedback_matrix(self):
+        """Map the current length's feedback matrix, rebuilding it in the background if stale"""
+        import feedback_matrix
+        store = self.current_store()
+        if store is None:
+            return
+        if self.resources is not None:
+            # Mapped once per process; a missing one is built once, not per session
+            matrix = self.resources.matrix(store.length)
+        else:
+            matrix = feedback_matrix.load(store)
+        with self.engine_lock:
+            # A matrix only fits the candidates of the store it was built for
+            if self.current_store() is store:
+                self.feedback_matrix = matrix
+        if matrix is not None:
+            self.profile.mark("feedback_matrix_mapped")
+        elif self.resources is None:
+            cancel = self.matrix_cancel
+
+            def build():
+                try:
+                    matrix = feedback_matrix.build(store, cancel=cancel)
+                except Exception:
+                    # Scoring falls back to feedback.score_batch and compute_attempt_colors
+                    return
+                with self.engine_lock:
+                    if self.current_store() is store:
+                        self.feedback_matrix = matrix
+            # Not a daemon: a build killed at exit would leave its temp file behind.
+            # Closing the page cancels it within one block instead
+            threading.Thread(target=build).start()
     
     def get_random_word(self, length: int = 5) -> str:
-        """Get a random 5-letter word"""
-        # Always use length 5
-        if 5 in self.words_by_length and self.words_by_length[5]:
-            return random.choice(self.words_by_length[5])
-        
-        # Fallback: use english_words library to find 5-letter words
-        if all_words:
-            candidates = [w for w in all_words if len(w) == 5 and w.isalpha()]
-            if candidates:
-                return random.choice(candidates)
-        
-        # Last resort: common 5-letter word
-        return "hello"
+        """Get a random word of the given length"""
+        return self.engine.get_random_word(length)
     
+    @_engine_locked
     def start_new_game(self):
         """Start a new game"""
-        self.current_word = self.get_random_word(self.word_length)
-        self.current_guess = ""
-        self.attempts = []
-        self.game_won = False
-        self.game_over = False
+        self.engine.start_new_game()
+        self.cancel_hint()
         # print(f"New word: {self.current_word}")  # For debugging
     
+    @_engine_locked
     def add_letter(self, letter: str):
         """Add a letter to current guess"""
-        if (
-            len(self.current_guess) < self.word_length
-            and not self.game_over
-            and self.game_started
-            and not self.game_paused
-        ):
-            self.current_guess += letter.lower()
+        if self.engine.add_letter(letter):
+            self.log_event(event_log.LETTER, letter.lower())
+            self.cancel_hint()
             self.update_ui()
     
+    @_engine_locked
     def remove_letter(self):
         """Remove last letter from current guess"""
-        if self.current_guess and not self.game_over and self.game_started and not self.game_paused:
-            self.current_guess = self.current_guess[:-1]
+        if self.engine.remove_letter():
+            self.log_event(event_log.BACKSPACE)
+            self.cancel_hint()
             self.update_ui()
     
+    @_engine_locked
     def submit_guess(self):
         """Submit current guess"""
-        if (
-            len(self.current_guess) == self.word_length
-            and not self.game_over
-            and self.game_started
-            and not self.game_paused
-        ):
-            # Accept the guess regardless of dictionary membership
-            self.attempts.append(self.current_guess)
-            self.current_guess = ""
-
-            # Check game state
-            if self.attempts[-1] == self.current_word:
-                self.game_won = True
-                self.game_over = True
-            elif len(self.attempts) >= self.max_attempts:
-                self.game_over = True
-
+        if self.engine.submit_guess():
+            self.log_event(event_log.ENTER)
+            self.record_result()
             self.update_ui()
     
     def get_letter_color(self, letter: str, position: int, attempt: str) -> str:
@@ -195,46 +395,37 @@ class WordGuessingGame:
         else:
             return self.themes[self.current_theme]["error"]
 
+    @metrics.timed("compute_attempt_colors")
     def compute_attempt_colors(self, attempt: str) -> List[str]:
         """Compute colors for an entire attempt using Wordle rules handling repeated letters.
 
-        - First mark exact matches (green)
-        - Count remaining letters in target (excluding greens)
-        - For non-green positions, mark yellow only up to remaining counts, otherwise gray
+        Greens first, then yellows only up to the target's remaining letter counts;
+        the rules live in feedback.score, pinned by tests/test_feedback.py.
         """
         target = self.current_word
-        n = len(target)
-        colors: List[Optional[str]] = [None] * n
-        
-        try:
-            theme = self.themes.get(self.current_theme, self.themes["cursor_dark"])
-        except (KeyError, IndexError):
-            theme = {"success": "#00ff00", "warning": "#ffff00", "error": "#ff0000"}
-
-        # Step 1: mark greens and build counts for remaining target letters
-        remaining: Dict[str, int] = {}
-        for i in range(n):
-            if i < len(attempt) and attempt[i] == target[i]:
-                colors[i] = theme.get("success", "#00ff00")
-            else:
-                remaining[target[i]] = remaining.get(target[i], 0) + 1
+        # O(1) lookup in the precomputed matrix when both words are in the list
+        code = self.feedback_matrix.lookup(attempt, target) if self.feedback_matrix is not None else None
+        if code is None:
+            code = feedback.score(attempt, target)
+        return self.pattern_colors(code)
 
-        # Step 2: mark yellows/greys for non-green positions
-        for i in range(n):
-            if colors[i] is not None:
-                continue
-            ch = attempt[i] if i < len(attempt) else ""
-            if ch and remaining.get(ch, 0) > 0:
-                colors[i] = theme.get("warning", "#ffff00")
-                remaining[ch] -= 1
-            else:
-                colors[i] = theme.get("error", "#ff0000")
-
-        return colors
+    def pattern_colors(self, code: int) -> List[str]:
+        """Theme colors for a pattern code from the engine"""
+        theme = self.themes.get(self.current_theme, self.themes["cursor_dark"])
+        state_colors = {
+            feedback.CORRECT: theme.get("success", "#00ff00"),
+            feedback.PRESENT: theme.get("warning", "#ffff00"),
+            feedback.ABSENT: theme.get("error", "#ff0000"),
+        }
+        return [state_colors[state] for state in feedback.decode_pattern(code, self.word_length)]
     
     def create_ui(self, page: ft.Page):
         """Create the main UI"""
+        self.profile.mark("page_connected")
+        metrics.start()
         self.page = page
+        page.on_disconnect = lambda e: self.page_closed()
+        page.on_close = lambda e: self.page_closed()
         page.title = "Word Guessing Game"
         page.theme_mode = ft.ThemeMode.DARK
         page.window_width = 650
@@ -253,8 +444,14 @@ class WordGuessingGame:
             on_select=self.change_theme
         )
         
-        # Word length selector - removed (only 5-letter words supported)
-        # self.length_dropdown is no longer used
+        # Word length selector
+        self.length_dropdown = ft.Dropdown(
+            label="Word length",
+            value=str(self.word_length),
+            options=[ft.dropdown.Option(str(n), f"{n} letters") for n in WORD_LENGTHS],
+            width=140,
+            on_select=self.change_length
+        )
         
         # Keyboard toggle
         self.keyboard_toggle = ft.Switch(
@@ -263,6 +460,36 @@ class WordGuessingGame:
             on_change=self.toggle_keyboard
         )
         
+        # Valid-guess mode toggle
+        self.valid_words_toggle = ft.Switch(
+            label="Valid words",
+            value=self.valid_words_only,
+            on_change=self.toggle_valid_words
+        )
+        
+        # Hard mode toggle
+        self.hard_mode_toggle = ft.Switch(
+            label="Hard mode",
+            value=self.engine.hard_mode,
+            on_change=self.toggle_hard_mode
+        )
+        
+        # Board count selector
+        self.boards_dropdown = ft.Dropdown(
+            label="Boards",
+            value=str(self.engine.board_count),
+            options=[ft.dropdown.Option(str(n), str(n)) for n in BOARD_COUNTS],
+            width=100,
+            on_select=self.change_boards
+        )
+        
+        # Adversarial mode toggle
+        self.adversarial_toggle = ft.Switch(
+            label="Absurdle",
+            value=self.engine.adversarial,
+            on_change=self.toggle_adversarial
+        )
+        
         # Game board
         self.game_board = ft.Column(spacing=5)
         
@@ -283,14 +510,21 @@ class WordGuessingGame:
             text_align=ft.TextAlign.CENTER
         )
 
+        # Solver suggestions
+        self.hint_text = ft.Text("", size=14, text_align=ft.TextAlign.CENTER)
+
         # Game controls: Begin / Pause / End
         self.begin_btn = ft.Button("Begin", on_click=lambda e: self.begin_game())
         self.pause_btn = ft.Button("Pause", on_click=lambda e: self.pause_game())
         self.end_btn = ft.Button("End", on_click=lambda e: self.end_game())
+        self.hint_btn = ft.Button("Hint", on_click=lambda e: self.request_hint())
+        self.stats_btn = ft.Button("Stats", on_click=lambda e: self.show_stats(), visible=self.resources is None)
         self.controls_row = ft.Row([
             self.begin_btn,
             self.pause_btn,
-            self.end_btn
+            self.end_btn,
+            self.hint_btn,
+            self.stats_btn
         ], alignment=ft.MainAxisAlignment.START, spacing=10)
         
         # Play again button
@@ -318,10 +552,16 @@ class WordGuessingGame:
                 ft.Column([
                     ft.Row([
                         ft.Container(self.theme_dropdown, bgcolor=None),
+                        ft.Container(self.length_dropdown, bgcolor=None),
+                        ft.Container(self.boards_dropdown, bgcolor=None),
                         ft.Container(self.keyboard_toggle, bgcolor=None),
-            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                        ft.Container(self.valid_words_toggle, bgcolor=None),
+                        ft.Container(self.adversarial_toggle, bgcolor=None),
+                        ft.Container(self.hard_mode_toggle, bgcolor=None),
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN, wrap=True),
             ft.Divider(),
             self.status_text,
+                    self.hint_text,
                     ft.Container(height=10),
                     self.controls_row,
             ft.Container(height=20),
@@ -330,42 +570,118 @@ class WordGuessingGame:
             self.current_guess_display,
             ft.Container(height=20),
             ft.Row([self.play_again_btn], alignment=ft.MainAxisAlignment.CENTER)
-                ], alignment=ft.MainAxisAlignment.START, spacing=0, expand=True)
+                ], alignment=ft.MainAxisAlignment.START, spacing=0, expand=True, scroll=ft.ScrollMode.AUTO)
             ], alignment=ft.MainAxisAlignment.START, spacing=40)
         )
         
-        # Initialize game
-        self.download_words()
-        self.load_words()
-        self.start_new_game()
+        # Render the empty board first; words load in the background
         self._setup_theme()
-        self.update_ui()
-        # Set up physical keyboard event handlers
+        self.build_board()
+        self.render()
+        self.profile.mark("first_paint")
+        page.run_thread(self.prepare_words)
+        # Set up the physical keyboard event handler (registered once, so keys are not
+        # delivered twice)
         page.on_keyboard_event = self.handle_keyboard_event
-        page.on_key_down = self.handle_keyboard_event
     
     def change_theme(self, e):
         """Change the current theme"""
+        if e.control.value == self.current_theme:
+            return
         self.current_theme = e.control.value
+        self._styles.clear()
         # Smooth theme switch: update all UI pieces with new theme
         self.apply_theme()
         self.update_ui()
     
+    @_engine_locked
+    def change_length(self, e):
+        """Switch word length; a game in progress restarts with a word of the new length"""
+        length = int(e.control.value)
+        if length == self.word_length:
+            return
+        # Before the switch, which may draw the next target
+        self.ensure_sampler(length)
+        self.engine.set_word_length(length)
+        self.log_event(event_log.LENGTH, length)
+        self.cancel_hint()
+        self.use_length()
+        # The board is sized to the word length, so its rows are rebuilt and sent whole
+        self.build_board()
+        self.push()
+        self.update_ui()
+        if self.words_by_length:
+            self.page.run_thread(self.load_length_data)
+    
+    @_engine_locked
+    def change_boards(self, e):
+        """Switch how many words are played at once; a game in progress restarts"""
+        if not self.engine.set_board_count(int(e.control.value)):
+            return
+        self.log_event(event_log.BOARDS, self.engine.board_count)
+        self.cancel_hint()
+        self.build_board()
+        self.push()
+        self.update_ui()
+    
     def toggle_keyboard(self, e):
         """Toggle keyboard visibility"""
         self.show_keyboard = e.control.value
         self.keyboard_container.visible = self.show_keyboard
         self.update_ui()
         if hasattr(self, 'page') and self.page:
-            self.page.update()
+            self.push(self.keyboard_container)
+    
+    @_engine_locked
+    def toggle_valid_words(self, e):
+        """Toggle valid-guess mode; the lexicon is loaded (or built once) in the background"""
+        self.valid_words_only = e.control.value
+        self.log_event(event_log.VALID_WORDS, self.valid_words_only)
+        if self.valid_words_only:
+            self.page.run_thread(self.load_valid_guesses)
+        else:
+            self.engine.valid_guesses = None
+            self.update_ui()
+    
+    @_engine_locked
+    def toggle_adversarial(self, e):
+        """Toggle adversarial mode, where the game dodges every guess it can"""
+        if self.engine.set_adversarial(e.control.value):
+            self.log_event(event_log.ADVERSARIAL, self.engine.adversarial)
+            self.cancel_hint()
+            self.update_ui()
+    
+    @_engine_locked
+    def toggle_hard_mode(self, e):
+        """Toggle hard mode; the current guess is re-checked straight away"""
+        if self.engine.set_hard_mode(e.control.value):
+            self.log_event(event_log.HARD_MODE, self.engine.hard_mode)
+            self.update_ui()
+    
+    def load_valid_guesses(self):
+        """Attach the allowed-guess lexicon for the current answer list to the engine"""
+        import word_index
+        store = self.current_store()
+        if store is None:
+            # use_words loads it once the words arrive
+            return
+        if self.resources is not None:
+            lexicon = self.resources.lexicon(self.word_length)
+        else:
+            lexicon = word_index.load_lexicon(store)
+        with self.engine_lock:
+            if self.valid_words_only and self.current_store() is store:
+                self.engine.valid_guesses = lexicon
+        if hasattr(self, 'page') and self.page:
+            self.update_ui()
     
     def apply_theme(self):
         """Apply current theme to the page and UI"""
         self._setup_theme()
+        if hasattr(self, 'page') and self.page:
+            self.push()
         # Proactively refresh controls that depend on theme colors
         self.update_ui()
-        if hasattr(self, 'page') and self.page:
-            self.page.update()
     
     def _setup_theme(self):
         """Setup theme colors without triggering UI updates (safe for init)"""
@@ -386,223 +702,578 @@ class WordGuessingGame:
         if hasattr(self, 'length_dropdown') and self.length_dropdown:
             self.length_dropdown.text_style = ft.TextStyle(color=fg)
             self.length_dropdown.label_style = ft.TextStyle(color=fg)
+        if hasattr(self, 'boards_dropdown') and self.boards_dropdown:
+            self.boards_dropdown.text_style = ft.TextStyle(color=fg)
+            self.boards_dropdown.label_style = ft.TextStyle(color=fg)
         # Switch label
         if hasattr(self, 'keyboard_toggle') and self.keyboard_toggle:
             self.keyboard_toggle.label = "Keyboard"
             self.keyboard_toggle.label_style = ft.TextStyle(color=fg)
+        if hasattr(self, 'valid_words_toggle') and self.valid_words_toggle:
+            self.valid_words_toggle.label_style = ft.TextStyle(color=fg)
+        if hasattr(self, 'adversarial_toggle') and self.adversarial_toggle:
+            self.adversarial_toggle.label_style = ft.TextStyle(color=fg)
+        if hasattr(self, 'hard_mode_toggle') and self.hard_mode_toggle:
+            self.hard_mode_toggle.label_style = ft.TextStyle(color=fg)
     
-    def create_letter_box(self, letter: str = "", color: str = None, is_current: bool = False) -> ft.Container:
+    def create_letter_box(self, letter: str = "", color: str = None, is_current: bool = False,
+                          size: int = 50) -> ft.Container:
         """Create a letter box for the game board"""
+        box = ft.Container(
+            width=size,
+            height=size,
+            border_radius=max(3, size // 6),
+            alignment=ft.Alignment(0, 0),
+            content=ft.Text("", size=size * 12 // 25, weight=ft.FontWeight.BOLD)
+        )
+        self.style_letter_box(box, letter, color, is_current)
+        return box
+    
+    def style_letter_box(self, box: ft.Container, letter: str = "", color: str = None,
+                         is_current: bool = False) -> bool:
+        """Apply letter and colors to an existing letter box; returns False if nothing changed"""
+        state = (letter, color, is_current, self.current_theme)
+        if self._rendered.get(id(box)) == state:
+            return False
+        self._rendered[id(box)] = state
         theme = self.themes[self.current_theme]
         
         if color is None:
             color = theme["border"]
         
-        return ft.Container(
-            width=50,
-            height=50,
-            border=ft.Border(left=ft.BorderSide(2, color), right=ft.BorderSide(2, color), top=ft.BorderSide(2, color), bottom=ft.BorderSide(2, color)),
-            border_radius=8,
-            alignment=ft.Alignment(0, 0),
-            bgcolor=theme["card_bg"] if not is_current else theme["primary"],
-            content=ft.Text(
-                letter.upper() if letter else "",
-                size=24,
-                weight=ft.FontWeight.BOLD,
-                color=theme["fg"]
-            )
-        )
+        box.border = self._border(color)
+        box.bgcolor = theme["card_bg"] if not is_current else theme["primary"]
+        box.content.value = letter.upper() if letter else ""
+        box.content.color = theme["fg"]
+        return True
+    
+    def _cached_style(self, key: tuple, factory):
+        """Shared style object for the current theme, created on first use"""
+        style = self._styles.get(key)
+        if style is None:
+            style = self._styles[key] = factory()
+        return style
+    
+    def _border(self, color: str) -> ft.Border:
+        return self._cached_style(("border", color), lambda: ft.Border.all(2, color))
+    
+    def _key_style(self, bg_key: str) -> ft.ButtonStyle:
+        theme = self.themes[self.current_theme]
+        return self._cached_style(("key", bg_key), lambda: ft.ButtonStyle(
+            bgcolor=theme[bg_key],
+            color=theme["fg"],
+            alignment=ft.Alignment(0, 0)
+        ))
+    
+    def _take_tile(self, size: int, is_current: bool = False) -> ft.Container:
+        """A blank letter box from the pool, or a new one"""
+        pool = self._tile_pool.get(size)
+        if not pool:
+            return self.create_letter_box(is_current=is_current, size=size)
+        box = pool.pop()
+        self._rendered.pop(id(box), None)
+        self.style_letter_box(box, is_current=is_current)
+        return box
+    
+    def _release_tiles(self):
+        """Return every board and guess tile to the pool before the board is rebuilt"""
+        for rows in self.board_tiles:
+            for tiles in rows:
+                for box in tiles:
+                    self._tile_pool.setdefault(box.width, []).append(box)
+        for box in self.guess_tiles:
+            self._tile_pool.setdefault(box.width, []).append(box)
+        self.board_tiles = []
+        self.guess_tiles = []
+    
+    def on_key_click(self, e):
+        # One handler for every letter key; the letter rides on the button's data
+        self.add_letter(e.control.data)
     
     def create_keyboard_row(self, letters: List[str]) -> ft.Row:
         """Create a row of keyboard buttons"""
-        theme = self.themes[self.current_theme]
-        keyboard_disabled = (not self.game_started) or self.game_paused or self.game_over
-        
         buttons = []
         for letter in letters:
             btn = ft.Button(
                 letter.upper(),
                 width=55,
                 height=50,
-                on_click=lambda e, l=letter: self.add_letter(l),
-                disabled=keyboard_disabled,
-                style=ft.ButtonStyle(
-                    bgcolor=theme["card_bg"],
-                    color=theme["fg"],
-                    alignment=ft.Alignment(0, 0)
-                )
+                data=letter,
+                on_click=self.on_key_click
             )
+            self.key_buttons[letter] = btn
             buttons.append(btn)
         
         return ft.Row(buttons, alignment=ft.MainAxisAlignment.CENTER, spacing=5)
     
-    def update_ui(self):
-        """Update the entire UI"""
-        theme = self.themes[self.current_theme]
+    def style_key(self, button: ft.Button, disabled: bool, bg_key: str = "card_bg") -> bool:
+        """Apply enabled state and theme colors to a keyboard button; returns False if nothing changed"""
+        state = (disabled, bg_key, self.current_theme)
+        if self._rendered.get(id(button)) == state:
+            return False
+        self._rendered[id(button)] = state
+        button.disabled = disabled
+        button.style = self._key_style(bg_key)
+        return True
+    
+    def build_board(self):
+        """Lay out the board and guess tiles for the current length and board count.
+
+        Tiles come from a pool and the keyboard is built only once, so switching
+        layouts allocates nothing that is already on hand; update_ui only mutates them.
+        """
+        self._release_tiles()
         
-        # Clear existing content
+        # Game boards: one persistent row of tiles per attempt, indexed [board][row][position]
+        board_count = self.engine.board_count
+        size = TILE_SIZES.get(board_count, min(TILE_SIZES.values()))
+        spacing = 5 if board_count == 1 else 2
+        self.board_tiles = []
+        # Per board: (pattern list, rows rendered, theme) at the last update_ui
+        self._board_rendered: List[Optional[tuple]] = [None] * board_count
         self.game_board.controls.clear()
+        columns = []
+        for _ in range(board_count):
+            rows = []
+            column = ft.Column(spacing=spacing)
+            for _ in range(self.engine.attempt_limit()):
+                tiles = [self._take_tile(size) for _ in range(self.word_length)]
+                rows.append(tiles)
+                column.controls.append(ft.Row(tiles, spacing=spacing, alignment=ft.MainAxisAlignment.CENTER))
+            self.board_tiles.append(rows)
+            columns.append(column)
+        if board_count == 1:
+            self.game_board.controls.extend(columns[0].controls)
+        else:
+            self.game_board.controls.append(ft.Row(columns, wrap=True, spacing=16, run_spacing=16,
+                                                   alignment=ft.MainAxisAlignment.CENTER))
+        
+        # Current guess display
+        self.guess_tiles = [self._take_tile(TILE_SIZES[1], is_current=True) for _ in range(self.word_length)]
         self.current_guess_display.controls.clear()
+        self.current_guess_display.controls.extend(self.guess_tiles)
+        
+        # Keyboard: independent of length and board count, so built once
+        if self.key_buttons:
+            return
+        # (letter states, disabled, theme) the key buttons were last styled for
+        self._keys_rendered: Optional[tuple] = None
         self.keyboard.controls.clear()
+        for row_letters in KEYBOARD_LAYOUT:
+            self.keyboard.controls.append(self.create_keyboard_row(list(row_letters)))
         
-        # Update game board
-        for attempt in self.attempts:
-            row = ft.Row(spacing=5, alignment=ft.MainAxisAlignment.CENTER)
-            colors = self.compute_attempt_colors(attempt)
-            for i, letter in enumerate(attempt):
-                color = colors[i]
-                row.controls.append(self.create_letter_box(letter, color))
-            self.game_board.controls.append(row)
+        # Add control buttons
+        self.backspace_btn = ft.Button("⌫", width=60, height=50, on_click=lambda e: self.remove_letter())
+        self.enter_btn = ft.Button("Enter", width=85, height=50, on_click=lambda e: self.submit_guess())
+        self.keyboard.controls.append(ft.Row(
+            [self.backspace_btn, self.enter_btn],
+            alignment=ft.MainAxisAlignment.CENTER,
+            spacing=10
+        ))
+    
+    def _patch(self, control, dirty: List, **values):
+        """Set only the attributes whose values differ and remember the control if any did"""
+        changed = False
+        for name, value in values.items():
+            if getattr(control, name) != value:
+                setattr(control, name, value)
+                changed = True
+        if changed:
+            dirty.append(control)
+    
+    @metrics.timed("update_ui")
+    def update_ui(self):
+        """Schedule a render for the next frame.
+
+        State changes apply immediately; every update_ui call within one frame (a
+        burst of typing, say) shares a single render and a single page update.
+        """
+        try:
+            # The scheduled render replaces Flet's automatic update after this event
+            ft.context.disable_auto_update()
+        except Exception:
+            pass
+        with self._schedule_lock:
+            if self._render_scheduled:
+                return
+            self._render_scheduled = True
+            self._render_requested_at = time.perf_counter()
+        try:
+            self.page.run_task(self._render_next_frame)
+        except Exception:
+            # No event loop to defer to; render straight away
+            with self._schedule_lock:
+                self._render_scheduled = False
+            self.render()
+    
+    async def _render_next_frame(self):
+        await asyncio.sleep(FRAME_SECONDS)
+        with self._schedule_lock:
+            self._render_scheduled = False
+            metrics.observe("render_delay", time.perf_counter() - self._render_requested_at)
+        self.render()
+    
+    @metrics.timed("render")
+    def render(self):
+        """Bring the persistent controls in line with the game state, pushing only what changed"""
+        with self._render_lock:
+            self._render()
+    
+    def _render(self):
+        theme = self.themes[self.current_theme]
+        dirty = []
         
-        # Add empty rows for remaining attempts
-        for _ in range(self.max_attempts - len(self.attempts)):
-            row = ft.Row(spacing=5, alignment=ft.MainAxisAlignment.CENTER)
-            for _ in range(self.word_length):
-                row.controls.append(self.create_letter_box())
-            self.game_board.controls.append(row)
+        # Update game boards; a board only changes when a guess lands on it, so
+        # typing never touches them and a submit only visits unsolved boards
+        for board, rows in enumerate(self.board_tiles):
+            patterns = self.engine.board_patterns[board] if board < len(self.engine.board_patterns) else []
+            # A new game replaces the pattern lists, so their identity is part of the state
+            state = (id(patterns), len(patterns), self.current_theme)
+            if self._board_rendered[board] == state:
+                continue
+            self._board_rendered[board] = state
+            for row, tiles in enumerate(rows):
+                if row < len(patterns):
+                    attempt = self.attempts[row]
+                    colors = self.pattern_colors(patterns[row])
+                    for i, box in enumerate(tiles):
+                        if self.style_letter_box(box, attempt[i], colors[i]):
+                            dirty.append(box)
+                else:
+                    for box in tiles:
+                        if self.style_letter_box(box):
+                            dirty.append(box)
         
-        # Update current guess display
-        for i in range(self.word_length):
+        # Update current guess display; a hard-mode violation outlines it in the error color
+        guess_border = theme["error"] if self.engine.hard_violation else None
+        for i, box in enumerate(self.guess_tiles):
             letter = self.current_guess[i] if i < len(self.current_guess) else ""
-            self.current_guess_display.controls.append(
-                self.create_letter_box(letter, is_current=True)
-            )
+            if self.style_letter_box(box, letter, guess_border, is_current=True):
+                dirty.append(box)
         
         # Update keyboard
-        if self.show_keyboard:
-            keyboard_layout = [
-                "qwertyuiop",
-                "asdfghjkl",
-                "zxcvbnm"
-            ]
-            
-            for row_letters in keyboard_layout:
-                self.keyboard.controls.append(
-                    self.create_keyboard_row(list(row_letters))
-                )
-            
-            # Add control buttons
-            control_row = ft.Row(
-                [
-                    ft.Button(
-                        "⌫",
-                        width=60,
-                        height=50,
-                        on_click=lambda e: self.remove_letter(),
-                        disabled=(not self.game_started) or self.game_paused or self.game_over,
-                        style=ft.ButtonStyle(
-                            bgcolor=theme["card_bg"],
-                            color=theme["fg"],
-                            alignment=ft.Alignment(0, 0)
-                        )
-                    ),
-                    ft.Button(
-                        "Enter",
-                        width=85,
-                        height=50,
-                        on_click=lambda e: self.submit_guess(),
-                        disabled=(not self.game_started) or self.game_paused or self.game_over,
-                        style=ft.ButtonStyle(
-                            bgcolor=theme["primary"],
-                            color=theme["fg"],
-                            alignment=ft.Alignment(0, 0)
-                        )
-                    )
-                ],
-                alignment=ft.MainAxisAlignment.CENTER,
-                spacing=10
-            )
-            self.keyboard.controls.append(control_row)
+        keyboard_disabled = (not self.game_started) or self.game_paused or self.game_over
+        # Letter states only change on submit, so keystrokes skip the 26 letter keys entirely
+        keys_state = (tuple(self.engine.letter_states), keyboard_disabled, self.current_theme)
+        if keys_state != self._keys_rendered:
+            self._keys_rendered = keys_state
+            for letter, button in self.key_buttons.items():
+                bg_key = KEY_COLORS[self.engine.letter_state(letter)]
+                if self.style_key(button, keyboard_disabled, bg_key):
+                    dirty.append(button)
+        if self.style_key(self.backspace_btn, keyboard_disabled):
+            dirty.append(self.backspace_btn)
+        if self.style_key(self.enter_btn, keyboard_disabled, "primary"):
+            dirty.append(self.enter_btn)
         
         # Update control buttons and status
-        self.begin_btn.disabled = self.game_started and not self.game_over
-        self.pause_btn.text = "Resume" if self.game_paused and self.game_started and not self.game_over else "Pause"
-        self.pause_btn.disabled = (not self.game_started) or self.game_over
-        self.end_btn.disabled = (not self.game_started) or self.game_over
-
-        if not self.game_started and not self.game_over:
-            self.status_text.value = "Click Begin to start the game."
-            self.status_text.color = theme["fg"]
-            self.play_again_btn.visible = False
+        self._patch(
+            self.begin_btn, dirty,
+            disabled=(self.game_started and not self.game_over) or not self.words_by_length
+        )
+        self._patch(
+            self.pause_btn, dirty,
+            content="Resume" if self.game_paused and self.game_started and not self.game_over else "Pause",
+            disabled=(not self.game_started) or self.game_over
+        )
+        self._patch(self.end_btn, dirty, disabled=(not self.game_started) or self.game_over)
+        self._patch(
+            self.hint_btn, dirty,
+            disabled=(not self.game_started) or self.game_paused or self.game_over or self.candidates is None
+        )
+        self._patch(self.hint_text, dirty, value=self.hint_message or self.key_notice,
+                    color=theme["secondary"] if self.hint_message else theme["warning"])
+
+        if not self.words_by_length:
+            status, color, show_play_again = "Loading dictionary...", theme["fg"], False
+        elif not self.game_started and not self.game_over:
+            status, color, show_play_again = "Click Begin to start the game.", theme["fg"], False
+            if self.words_loading:
+                status += " (full dictionary still loading)"
         elif self.game_paused and not self.game_over:
-            self.status_text.value = "Game paused. Click Resume to continue."
-            self.status_text.color = theme["warning"]
-            self.play_again_btn.visible = False
+            status, color, show_play_again = "Game paused. Click Resume to continue.", theme["warning"], False
         elif self.game_won:
-            self.status_text.value = f"Congratulations! You won in {len(self.attempts)} attempts!"
-            self.status_text.color = theme["success"]
-            self.play_again_btn.visible = True
+            status, color, show_play_again = f"Congratulations! You won in {len(self.attempts)} attempts!", theme["success"], True
+        elif self.game_over and self.engine.board_count > 1:
+            words = ", ".join(self.engine.targets[board].upper() for board in self.engine.unsolved_boards())
+            status, color, show_play_again = f"Game Over! Unsolved: {words}", theme["error"], True
         elif self.game_over:
-            self.status_text.value = f"Game Over! The word was: {self.current_word.upper()}"
-            self.status_text.color = theme["error"]
-            self.play_again_btn.visible = True
+            status, color, show_play_again = f"Game Over! The word was: {self.current_word.upper()}", theme["error"], True
         else:
-            self.status_text.value = f"Attempts: {len(self.attempts)}/{self.max_attempts}"
-            self.status_text.color = theme["fg"]
-            self.play_again_btn.visible = False
+            status = f"Attempts: {len(self.attempts)}/{self.engine.attempt_limit()}"
+            if self.engine.board_count > 1:
+                solved = self.engine.board_count - len(self.engine.unsolved_boards())
+                status += f" · {solved}/{self.engine.board_count} solved"
+            elif self.candidates is not None and self.attempts:
+                remaining = len(self.candidates)
+                status += f" · {remaining} word{'s' if remaining != 1 else ''} remain{'s' if remaining == 1 else ''}"
+            color, show_play_again = theme["fg"], False
+            if self.engine.rejected_guess:
+                status, color = f"Not in word list: {self.engine.rejected_guess.upper()}", theme["warning"]
+            elif self.engine.hard_violation:
+                status, color = f"Hard mode: {self.engine.hard_violation}", theme["warning"]
+        self._patch(self.status_text, dirty, value=status, color=color)
+        self._patch(self.play_again_btn, dirty, visible=show_play_again)
         
-        self.page.update()
+        metrics.count("render_controls", len(dirty))
+        if dirty:
+            self.push(*dirty)
+
+    @metrics.timed("page_update")
+    def push(self, *controls):
+        """page.update, timed separately so transfer cost can be told apart from rendering"""
+        self.page.update(*controls)
     
+    @_engine_locked
     def play_again(self, e):
         """Start a new game"""
-        self.start_new_game()
-        self.game_started = True
-        self.game_paused = False
+        self.engine.play_again()
+        self.log_event(event_log.PLAY_AGAIN)
+        self.cancel_hint()
+        self.key_notice = ""
         self.update_ui()
 
     def handle_keyboard_event(self, e: ft.KeyboardEvent):
         # Accept inputs even if not started: first key press begins the game (letters/backspace) or submit (enter)
         if e.key is None:
             return
+        # Each press arrives once (the handler is registered once), so repeats such as
+        # the double P in APPLE are real key presses
         key_raw = e.key
         key = key_raw.lower()
+        if key == "f9" and metrics.enabled:
+            self.toggle_profiler()
+            return
 
         # Normalize Enter keys across platforms (Enter, NumpadEnter, Return)
         is_enter = key in {"enter", "numpadenter", "return"}
         is_backspace = key == "backspace"
-        is_letter = len(key) == 1 and key.isalpha()
+        is_letter = len(key) == 1 and "a" <= key <= "z"
 
         # If game paused or over, ignore
         if self.game_over or self.game_paused:
             return
 
-        # Auto-begin on first interaction if not started yet
+        # Auto-begin on first interaction if not started yet (once words are available)
+        if not self.words_by_length:
+            return
         if not self.game_started and (is_letter or is_backspace or is_enter):
             self.begin_game()
 
         # After ensuring started, route actions
         if is_letter:
+            # Same per-letter array as the on-screen keys: warn about ruled-out letters
+            ruled_out = self.engine.letter_state(key) == feedback.ABSENT
+            self.key_notice = f"{key.upper()} is not in the word" if ruled_out else ""
             self.add_letter(key)
         elif is_enter:
+            self.key_notice = ""
             self.submit_guess()
         elif is_backspace:
+            self.key_notice = ""
             self.remove_letter()
 
+    def toggle_profiler(self):
+        """Start sampling every thread, or stop and save the stacks in the working directory"""
+        if self.profiler is None:
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+            self.key_notice = "Profiling... press F9 again to stop"
+        else:
+            self.profiler.stop()
+            try:
+                self.key_notice = f"Profile saved to {self.profiler.save()}"
+            except OSError as e:
+                self.key_notice = f"Profile not saved: {e}"
+            self.profiler = None
+        self.update_ui()
+
+    def request_hint(self):
+        """Rank next guesses by expected information in the background.
+
+        The solver runs off the UI thread (its opening table in a process pool) and
+        is cancelled as soon as the player types, since the hint would be stale.
+        """
+        from solver import Cancelled, Solver
+        if self.candidates is None or not self.game_started or self.game_over or self.game_paused:
+            return
+        self.cancel_hint()
+        if self.solver is None:
+            if self.resources is not None:
+                self.solver = self.resources.solver(self.word_length)
+            else:
+                self.solver = Solver(self.current_store())
+        self.solver.matrix = self.feedback_matrix
+        cancel = threading.Event()
+        self.hint_cancel = cancel
+        with self.engine_lock:
+            candidates = self.engine.active_candidates().indices.copy()
+        self.hint_message = "Thinking..."
+        self.update_ui()
+
+        def work():
+            try:
+                suggestions = self.solver.suggest(candidates, top=3, cancel=cancel)
+            except Cancelled:
+                return
+            if cancel.is_set():
+                return
+            if suggestions:
+                self.hint_message = "Try: " + ", ".join(
+                    f"{word.upper()} ({bits:.1f} bits)" for word, bits in suggestions
+                )
+            else:
+                self.hint_message = "No words match the feedback so far."
+            self.update_ui()
+
+        self.page.run_thread(work)
+
+    def cancel_hint(self):
+        """Cancel a running hint request and clear any shown hint"""
+        if self.hint_cancel is not None:
+            self.hint_cancel.set()
+            self.hint_cancel = None
+        self.hint_message = ""
+
+    @_engine_locked
     def begin_game(self):
         # Start or restart the game and enable inputs
+        if not self.words_by_length:
+            return
         if not self.game_started or self.game_over:
-            self.start_new_game()
-        self.game_started = True
-        self.game_paused = False
+            self.cancel_hint()
+            self.key_notice = ""
+        self.engine.begin()
+        self.log_event(event_log.BEGIN)
         self.update_ui()
 
+    @_engine_locked
     def pause_game(self):
         # Toggle pause state if game is started and not over
-        if not self.game_started or self.game_over:
-            return
-        self.game_paused = not self.game_paused
-        self.update_ui()
+        if self.engine.pause():
+            self.log_event(event_log.PAUSE)
+            self.update_ui()
 
+    @_engine_locked
     def end_game(self):
         # End the game immediately
-        if not self.game_started or self.game_over:
+        if self.engine.end():
+            self.log_event(event_log.END)
+            self.record_result()
+            self.update_ui()
+
+    def open_event_log(self, words_by_length: Dict):
+        """Open the session log once, before any target is drawn, and seed the engine for it"""
+        if self._event_log_checked:
             return
-        self.game_over = True
-        self.update_ui()
+        self._event_log_checked = True
+        self.event_log = event_log.open_session_log(index_key=getattr(words_by_length, "key", ""))
+        if self.event_log is None:
+            return
+        # Replays reseed the engine with this
+        seed = random.getrandbits(63)
+        self.engine.rng = random.Random(seed)
+        self.event_log.write(event_log.SEED, seed)
+
+    def page_closed(self):
+        """Release the session's files and stop background matrix builds"""
+        self.matrix_cancel.set()
+        self.matrix_cancel = threading.Event()
+        self.close_event_log()
+
+    def close_event_log(self):
+        """Release the session log file; a reconnected page reopens it on the next event"""
+        if self.event_log is not None:
+            self.event_log.close()
+
+    def log_event(self, kind: int, value=None):
+        """Append a player action to the session log, with any targets it drew"""
+        if self.event_log is None:
+            return
+        self.event_log.write(kind, value)
+        if self.engine.targets is not self._logged_targets and self.engine.targets:
+            # start_new_game replaces the list, so identity tells a new draw apart
+            self._logged_targets = self.engine.targets
+            self.event_log.write(event_log.TARGETS, list(self.engine.targets))
+
+    def record_result(self):
+        """Log the finished game and queue it for the stats database (written in the background)"""
+        from stats import GameResult, mode_name
+        engine = self.engine
+        if not engine.game_over:
+            return
+        if self.event_log is not None:
+            self.event_log.write(event_log.RESULT, (engine.game_won, len(engine.attempts)))
+        if self.stats is None or not engine.attempts:
+            return
+        self.stats.record(GameResult(
+            length=engine.word_length,
+            boards=engine.board_count,
+            mode=mode_name(engine.adversarial, engine.hard_mode),
+            won=engine.game_won,
+            guesses=len(engine.attempts),
+            targets=list(engine.targets),
+            # Guess number that solved each target
+            solved_at=[None if at is None else at + 1 for at in engine.solved_at],
+            finished_at=time.time(),
+        ))
+
+    def show_stats(self):
+        """Show streaks, the guess distribution and the hardest words for the current kind of game"""
+        from stats import mode_name
+        if self.stats is None:
+            return
+        engine = self.engine
+        key = (engine.word_length, engine.board_count, mode_name(engine.adversarial, engine.hard_mode))
+
+        def work():
+            # Just-finished games may still be queued; flush and read off the UI thread
+            self.stats.flush()
+            try:
+                summary = self.stats.summary(*key)
+            except Exception:
+                return
+            self.show_stats_dialog(key, summary)
+
+        self.page.run_thread(work)
+
+    def show_stats_dialog(self, key: tuple, summary: Dict):
+        length, boards, mode = key
+        theme = self.themes[self.current_theme]
+        lines = [
+            ft.Text(f"Played {summary['played']}   Win rate {summary['win_rate']:.0%}"),
+            ft.Text(f"Current streak {summary['current_streak']}   Best streak {summary['max_streak']}"),
+        ]
+        distribution = summary["distribution"]
+        if distribution:
+            lines.append(ft.Text("Guesses to solve", weight=ft.FontWeight.BOLD))
+            most = max(distribution.values())
+            for guesses, count in distribution.items():
+                lines.append(ft.Row([
+                    ft.Text(str(guesses), width=24),
+                    ft.Container(width=max(4, 200 * count / most), height=16, bgcolor=theme["success"]),
+                    ft.Text(str(count)),
+                ], spacing=6))
+        if summary["hardest"]:
+            lines.append(ft.Text("Hardest words", weight=ft.FontWeight.BOLD))
+            for word, solve_rate, guesses in summary["hardest"]:
+                lines.append(ft.Text(f"{word.upper()}  solved {solve_rate:.0%}, {guesses:.1f} guesses"))
+        self.page.show_dialog(ft.AlertDialog(
+            title=ft.Text(f"Statistics ({length} letters"
+                          f"{f', {boards} boards' if boards > 1 else ''}{'' if mode == 'normal' else ', ' + mode})"),
+            content=ft.Column(lines, tight=True, spacing=6),
+            actions=[ft.TextButton("Close", on_click=lambda e: self.page.pop_dialog())],
+        ))
 
 def main(page: ft.Page):
     game = WordGuessingGame()
     game.create_ui(page)
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        os.environ["WORD_GAME_PROFILE_STARTUP"] = "1"
+    if "--metrics" in sys.argv:
+        os.environ["WORD_GAME_METRICS"] = "1"
+    if "--event-log" in sys.argv[:-1]:
+        os.environ[event_log.EVENT_LOG_ENV] = sys.argv[sys.argv.index("--event-log") + 1]
     ft.app(target=main) 
\ No newline at end of file
@@ -0,0 +1,542 @@
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Mapping
+from typing import Dict, List, Mapping as MappingType, Optional, Set
+
+import numpy as np
+
+# Word list generation rules. Anything that changes the generated list must be
+# part of the cache key below so a stale index is never served.
+WORDS_FILE = "words.txt"
+CACHE_DIR_NAME = ".word_cache"
+INDEX_FORMAT_VERSION = 2
+WORDFREQ_LANG = "en"
+WORDFREQ_TOP_N = 50000
+MIN_LENGTH = 5
+MAX_LENGTH = 8
+# Allowed-guess lexicon: a much larger list than the answers. Bump the version
+# whenever the rules below change so cached lexicons are rebuilt.
+LEXICON_VERSION = 3
+LEXICON_TOP_N = 300000
+# wordfreq lists include names, typos and noise ("hahah", "zzzzz", deeper down
+# almost nothing else), so allowed guesses must be a dictionary word or an
+# inflection of one. The answer list is left as it is; valid-words games only
+# draw targets the lexicon accepts
+DICTIONARIES = ["web2", "gcide"]
+INFLECTION_SUFFIXES = ("s", "es", "ed", "d", "ing", "er", "ers", "est", "ly")
+
+FALLBACK_WORDS = [
+    # 5 letters
+    "about", "after", "again", "below", "bring", "cause", "could", "every", "first", "found",
+    "great", "group", "house", "large", "learn", "never", "other", "place", "right", "small",
+    "sound", "still", "study", "their", "there", "these", "thing", "think", "those", "under",
+    "water", "where", "which", "world", "young",
+    # 6 letters
+    "little", "people", "public", "number", "school", "family", "system", "change", "should", "during",
+    "better", "always", "second", "before", "father", "mother", "others", "street", "market", "friend",
+    # 7 letters
+    "another", "because", "between", "country", "example", "history", "interest", "morning", "nothing", "picture",
+    "program", "service", "through", "without", "womanly", "working", "writing", "student", "teacher", "company",
+    # 8 letters
+    "anything", "building", "children", "decision", "distance", "everyone", "football", "language", "learning", "meeting",
+    "research", "security", "solution", "strength", "training", "treasure", "universe", "whatever", "yourself", "business",
+]
+
+
+def wordfreq_version() -> Optional[str]:
+    """Installed wordfreq version, read from package metadata (no import of the tables)"""
+    try:
+        from importlib.metadata import version
+        return version("wordfreq")
+    except Exception:
+        return None
+
+
+def cache_dir_for(words_file: str) -> str:
+    """The index cache lives next to the word list it was built from"""
+    return os.path.join(os.path.dirname(os.path.abspath(words_file)), CACHE_DIR_NAME)
+
+
+def _file_signature(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _filter_rules() -> Dict[str, object]:
+    return {"min_length": MIN_LENGTH, "max_length": MAX_LENGTH, "alpha_only": True, "ascii_only": True, "lowercase": True}
+
+
+def _wordfreq_source(version: str) -> Dict[str, object]:
+    return {
+        "format": INDEX_FORMAT_VERSION,
+        "source": "wordfreq",
+        "wordfreq_version": version,
+        "lang": WORDFREQ_LANG,
+        "top_n": WORDFREQ_TOP_N,
+        "rules": _filter_rules(),
+    }
+
+
+def _file_source(words_file: str) -> Dict[str, object]:
+    return {
+        "format": INDEX_FORMAT_VERSION,
+        "source": "file",
+        "file": _file_signature(words_file),
+        "rules": _filter_rules(),
+    }
+
+
+def current_source(words_file: str = WORDS_FILE) -> Dict[str, object]:
+    """Describe where the word list comes from and the rules used to filter it.
+
+    With wordfreq installed the list is regenerated from it, so the key is the
+    wordfreq version plus the filter rules. Otherwise words.txt itself is the
+    source and its size/mtime are the key.
+    """
+    version = wordfreq_version()
+    if version is not None:
+        return _wordfreq_source(version)
+    return _file_source(words_file)
+
+
+def cache_key(source: Dict[str, object]) -> str:
+    """Stable hash of a source description"""
+    blob = json.dumps(source, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def filter_words(words: List[str]) -> List[str]:
+    """Apply the filter rules: lowercase, ASCII alphabetic, 5-8 letters, deduplicated in order"""
+    seen = set()
+    deduped = []
+    for w in words:
+        w = w.strip().lower()
+        if not w or w.startswith("#"):
+            continue
+        if w.isascii() and w.isalpha() and MIN_LENGTH <= len(w) <= MAX_LENGTH and w not in seen:
+            seen.add(w)
+            deduped.append(w)
+    return deduped
+
+
+def write_words_file(words: List[str], source_comment: str, words_file: str = WORDS_FILE):
+    """Write the word list export, atomically so concurrent readers never see a partial file"""
+    tmp = f"{words_file}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f"# source: {source_comment}\n")
+        f.write("\n".join(words))
+    os.replace(tmp, words_file)
+
+
+def generate_wordfreq_words(words_file: str = WORDS_FILE) -> List[str]:
+    """Generate common English words (5-8 letters) using wordfreq and export them to words.txt"""
+    from wordfreq import top_n_list
+    words = filter_words(top_n_list(WORDFREQ_LANG, WORDFREQ_TOP_N))
+    if not words:
+        raise RuntimeError("No words produced from wordfreq")
+    write_words_file(words, "wordfreq top common words 5-8 letters", words_file)
+    return words
+
+
+def write_fallback_words(words_file: str = WORDS_FILE) -> List[str]:
+    """Export the built-in fallback list to words.txt"""
+    write_words_file(FALLBACK_WORDS, "built-in common words 5-8 letters", words_file)
+    return list(FALLBACK_WORDS)
+
+
+def read_words_file(words_file: str = WORDS_FILE) -> List[str]:
+    """Read and filter words.txt"""
+    with open(words_file, "r", encoding="utf-8") as f:
+        return filter_words(f.read().splitlines())
+
+
+def word_frequencies(words: List[str], from_wordfreq: bool) -> List[float]:
+    """Frequency of each word: wordfreq's estimate when available, else Zipf's law on list rank"""
+    if from_wordfreq:
+        try:
+            from wordfreq import word_frequency
+            return [word_frequency(w, WORDFREQ_LANG) for w in words]
+        except Exception:
+            pass
+    return [0.1 / (rank + 1) for rank in range(len(words))]
+
+
+class WordStore:
+    """Packed, read-only store of same-length words.
+
+    Words are kept as an N x length matrix of ASCII bytes with a parallel float32
+    frequency array, in list (frequency rank) order. Both arrays are saved as .npy
+    files and loaded with mmap, so every process on a box shares the same pages
+    instead of holding its own list of str objects.
+    """
+
+    def __init__(self, letters: np.ndarray, freqs: np.ndarray, order: Optional[np.ndarray] = None):
+        self.letters = letters
+        self.freqs = freqs
+        self.length = letters.shape[1] if letters.ndim == 2 else 0
+        self._order = order
+        self._sorted_keys: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_words(cls, words: List[str], freqs: Optional[List[float]] = None) -> "WordStore":
+        """Pack a list of same-length words"""
+        length = len(words[0]) if words else 0
+        letters = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), length)
+        if freqs is None:
+            freqs = [0.1 / (rank + 1) for rank in range(len(words))]
+        return cls(letters.copy(), np.asarray(freqs, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return self.letters.shape[0]
+
+    def __getitem__(self, i: int) -> str:
+        return self.letters[i].tobytes().decode("ascii")
+
+    def __iter__(self):
+        for row in self.letters:
+            yield row.tobytes().decode("ascii")
+
+    def __contains__(self, word: str) -> bool:
+        return self.index_of(word) is not None
+
+    def words(self) -> List[str]:
+        """Unpack to a list of str (allocates; avoid on hot paths)"""
+        return list(self)
+
+    @property
+    def order(self) -> np.ndarray:
+        """Permutation that sorts the words, used for O(log n) lookups without a per-process dict"""
+        if self._order is None:
+            self._order = np.argsort(self._keys(), kind="stable").astype(np.int32)
+        return self._order
+
+    def _keys(self) -> np.ndarray:
+        return np.ascontiguousarray(self.letters).view(f"S{self.length}").ravel()
+
+    def index_of(self, word: str) -> Optional[int]:
+        """Row of a word in the store, or None"""
+        if len(word) != self.length or not len(self):
+            return None
+        if self._sorted_keys is None:
+            self._sorted_keys = self._keys()[self.order]
+        key = word.encode("ascii", "ignore")
+        pos = self._sorted_keys.searchsorted(key)
+        if pos < len(self) and self._sorted_keys[pos] == key:
+            return int(self.order[pos])
+        return None
+
+    def save(self, directory: str, prefix: str):
+        """Write letters, frequencies and sort order as <prefix>.letters/.freqs/.order.npy"""
+        for name, array in (("letters", self.letters), ("freqs", self.freqs), ("order", self.order)):
+            path = os.path.join(directory, f"{prefix}.{name}.npy")
+            tmp = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp, np.ascontiguousarray(array))
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, directory: str, prefix: str, mmap: bool = True) -> "WordStore":
+        """Load a saved store; with mmap the arrays are read-only views of the page cache"""
+        mode = "r" if mmap else None
+        # Plain ndarray views over the mapping: no copy, and no np.memmap indexing overhead
+        arrays = [np.asarray(np.load(os.path.join(directory, f"{prefix}.{name}.npy"), mmap_mode=mode))
+                  for name in ("letters", "freqs", "order")]
+        return cls(*arrays)
+
+
+def pack_by_length(words: List[str], freqs: List[float]) -> Dict[int, WordStore]:
+    """Group words by length into packed stores, keeping list order"""
+    grouped: Dict[int, List[int]] = {}
+    for i, w in enumerate(words):
+        grouped.setdefault(len(w), []).append(i)
+    return {
+        length: WordStore.from_words([words[i] for i in rows], [freqs[i] for i in rows])
+        for length, rows in sorted(grouped.items())
+    }
+
+
+def _index_path(words_file: str) -> str:
+    return os.path.join(cache_dir_for(words_file), "index.json")
+
+
+def _store_prefix(key: str, length: int) -> str:
+    return f"{key[:16]}.len{length}"
+
+
+class LazyIndex(Mapping):
+    """Length -> WordStore mapping over a saved index; each length is mapped on first access.
+
+    Lengths that are never played cost nothing beyond their manifest entry.
+    """
+
+    def __init__(self, cache_dir: str, key: str, lengths: List[int]):
+        self.cache_dir = cache_dir
+        self.key = key
+        self.lengths = sorted(lengths)
+        self._stores: Dict[int, WordStore] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, length: int) -> WordStore:
+        store = self._stores.get(length)
+        if store is None:
+            if length not in self.lengths:
+                raise KeyError(length)
+            with self._lock:
+                store = self._stores.get(length)
+                if store is None:
+                    store = WordStore.load(self.cache_dir, _store_prefix(self.key, length))
+                    self._stores[length] = store
+        return store
+
+    def __contains__(self, length) -> bool:
+        # Membership must not load the store
+        return length in self.lengths
+
+    def __iter__(self):
+        return iter(self.lengths)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+
+def read_index(words_file: str = WORDS_FILE, key: Optional[str] = None) -> Optional[LazyIndex]:
+    """Open the prebuilt index, or None when it is missing, corrupt or built under another key.
+
+    Only the manifest is read here; stores are mapped per length on first use.
+    """
+    cache_dir = cache_dir_for(words_file)
+    try:
+        with open(_index_path(words_file), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if key is not None and data.get("key") != key:
+            return None
+        if data.get("format") != INDEX_FORMAT_VERSION:
+            return None
+        lengths = [int(length) for length in data.get("lengths", {})]
+        for length in lengths:
+            for name in ("letters", "freqs", "order"):
+                if not os.path.exists(os.path.join(cache_dir, f"{_store_prefix(data['key'], length)}.{name}.npy")):
+                    return None
+        return LazyIndex(cache_dir, data["key"], lengths)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_index(words_by_length: Dict[int, WordStore], key: str, source: Dict[str, object],
+                words_file: str = WORDS_FILE):
+    """Persist the packed stores, then the manifest, so the manifest never names missing files"""
+    cache_dir = cache_dir_for(words_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    for length, store in words_by_length.items():
+        store.save(cache_dir, _store_prefix(key, length))
+    path = _index_path(words_file)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "format": INDEX_FORMAT_VERSION,
+            "key": key,
+            "source": source,
+            "lengths": {str(length): len(store) for length, store in sorted(words_by_length.items())},
+        }, f)
+    os.replace(tmp, path)
+    _remove_stale_stores(cache_dir, key)
+
+
+# Files written by WordStore.save
+STORE_SUFFIXES = (".letters.npy", ".freqs.npy", ".order.npy")
+
+
+def _remove_stale_stores(cache_dir: str, key: str):
+    # Processes that still map an old store keep their pages until they exit
+    for name in os.listdir(cache_dir):
+        # Only word stores ("<key>.len<n>.<field>.npy"); lexicons and opening tables have their own keys
+        if ".len" in name and name.endswith(STORE_SUFFIXES) and not name.startswith(key[:16]):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def build_index(words_file: str = WORDS_FILE) -> MappingType[int, WordStore]:
+    """Regenerate the word list from its source and write a fresh index.
+
+    Falls back to words.txt and then to the built-in list if generation fails.
+    """
+    source = current_source(words_file)
+    words: List[str] = []
+    if source["source"] == "wordfreq":
+        try:
+            words = generate_wordfreq_words(words_file)
+        except Exception:
+            words = []
+    from_wordfreq = bool(words)
+    if not words:
+        try:
+            words = read_words_file(words_file)
+        except OSError:
+            words = []
+        if not words:
+            words = write_fallback_words(words_file)
+        # Key a fallback by the file it came from; if wordfreq is installed the
+        # key will not match next launch and generation is retried.
+        source = _file_source(words_file)
+    key = cache_key(source)
+    words_by_length = pack_by_length(words, word_frequencies(words, from_wordfreq))
+    try:
+        write_index(words_by_length, key, source, words_file)
+        # Hand back mmapped views so this process shares pages like every other one
+        return read_index(words_file, key) or words_by_length
+    except OSError:
+        return words_by_length
+
+
+def read_current_index(words_file: str = WORDS_FILE) -> Optional[LazyIndex]:
+    """The cached index if it is fresh for the current source, without ever regenerating"""
+    return read_index(words_file, cache_key(current_source(words_file)))
+
+
+def quick_index(words_file: str = WORDS_FILE) -> Dict[int, WordStore]:
+    """A playable index available immediately: the existing words.txt as is, else the built-in list"""
+    try:
+        words = read_words_file(words_file)
+    except OSError:
+        words = []
+    if not words:
+        words = list(FALLBACK_WORDS)
+    return pack_by_length(words, word_frequencies(words, False))
+
+
+def load_index(words_file: str = WORDS_FILE) -> MappingType[int, WordStore]:
+    """Load the word index, regenerating it only when the cache is stale or missing"""
+    words_by_length = read_current_index(words_file)
+    if words_by_length is None:
+        words_by_length = build_index(words_file)
+    return words_by_length
+
+
+def encode_word(word: str) -> int:
+    """Base-26 integer of a lowercase word; fits uint64 up to 13 letters"""
+    code = 0
+    for ch in word:
+        code = code * 26 + (ord(ch) - 97)
+    return code
+
+
+def _encode_letters(letters: np.ndarray) -> np.ndarray:
+    codes = np.zeros(letters.shape[0], dtype=np.uint64)
+    for i in range(letters.shape[1]):
+        codes = codes * np.uint64(26) + (letters[:, i].astype(np.uint64) - np.uint64(97))
+    return codes
+
+
+class GuessLexicon:
+    """Allowed guesses of one length as a sorted, mmapped array of base-26 codes.
+
+    Membership is one binary search over 8 bytes per word, shared between
+    processes, instead of a per-process set of 100k+ strings.
+    """
+
+    def __init__(self, length: int, codes: np.ndarray):
+        self.length = length
+        self.codes = codes
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, word: str) -> bool:
+        if len(word) != self.length or not word.isascii() or not word.isalpha():
+            return False
+        code = np.uint64(encode_word(word.lower()))
+        pos = self.codes.searchsorted(code)
+        return pos < len(self.codes) and self.codes[pos] == code
+
+    @classmethod
+    def from_words(cls, length: int, words: List[str], answers: Optional[WordStore] = None) -> "GuessLexicon":
+        packed = [w for w in filter_words(words) if len(w) == length]
+        letters = WordStore.from_words(packed).letters if packed else np.zeros((0, length), dtype=np.uint8)
+        codes = _encode_letters(letters)
+        if answers is not None and len(answers):
+            codes = np.concatenate([codes, _encode_letters(np.asarray(answers.letters))])
+        return cls(length, np.unique(codes))
+
+
+def dictionary_words() -> Set[str]:
+    """Lowercase alphabetic words of the english_words dictionaries, or an empty set"""
+    try:
+        from english_words import get_english_words_set
+        return get_english_words_set(DICTIONARIES, lower=True, alpha=True)
+    except ImportError:
+        pass
+    try:
+        # english_words before 2.0
+        from english_words import english_words_lower_alpha_set
+        return set(english_words_lower_alpha_set)
+    except ImportError:
+        return set()
+
+
+def _inflects(word: str, dictionary: Set[str]) -> bool:
+    # "carts" -> cart, "tried" -> try, "stopped" -> stop, "using" -> use
+    for suffix in INFLECTION_SUFFIXES:
+        if not word.endswith(suffix) or len(word) == len(suffix):
+            continue
+        stem = word[:-len(suffix)]
+        bases = [stem, stem + "e"]
+        if stem[-1] == "i":
+            bases.append(stem[:-1] + "y")
+        if len(stem) > 1 and stem[-1] == stem[-2]:
+            bases.append(stem[:-1])
+        # Bases under three letters match too much noise
+        if any(len(base) >= 3 and base in dictionary for base in bases):
+            return True
+    return False
+
+
+def lexicon_words() -> List[str]:
+    """Raw allowed-guess candidates: dictionary words plus common inflections of them from wordfreq"""
+    dictionary = dictionary_words()
+    try:
+        from wordfreq import top_n_list
+        common = top_n_list(WORDFREQ_LANG, LEXICON_TOP_N)
+    except Exception:
+        common = []
+    if not dictionary:
+        # No dictionary to check against: only the answers themselves are accepted
+        return []
+    inflected = [w for w in common if w not in dictionary and _inflects(w, dictionary)]
+    return sorted(dictionary) + inflected
+
+
+def _lexicon_path(answers: WordStore, words_file: str) -> str:
+    digest = hashlib.sha1(json.dumps({
+        "version": LEXICON_VERSION,
+        "top_n": LEXICON_TOP_N,
+        "wordfreq_version": wordfreq_version(),
+        "rules": _filter_rules(),
+    }, sort_keys=True).encode("utf-8"))
+    digest.update(np.ascontiguousarray(answers.letters).tobytes())
+    return os.path.join(cache_dir_for(words_file), f"guesses{answers.length}-{digest.hexdigest()[:16]}.npy")
+
+
+def load_lexicon(answers: WordStore, words_file: str = WORDS_FILE) -> GuessLexicon:
+    """Allowed guesses for the answers' length (just the answers when no dictionary is installed), built once and cached"""
+    path = _lexicon_path(answers, words_file)
+    try:
+        return GuessLexicon(answers.length, np.asarray(np.load(path, mmap_mode="r")))
+    except (OSError, ValueError):
+        pass
+    words = lexicon_words()
+    # Without a dictionary only the answers themselves are accepted
+    lexicon = GuessLexicon.from_words(answers.length, words, None if words else answers)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, lexicon.codes)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return lexicon
@@ -0,0 +1,157 @@
+"""Word data shared by every game in a process.
+
+The hosted server runs many sessions per process. Each session keeps only its
+own game state; the word index, feedback matrices, lexicons, target samplers
+and solvers are loaded once here and only ever read. Stores and matrices are
+memory-mapped, so worker processes also share their pages through the OS.
+"""
+import threading
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import word_index
+from word_index import WordStore
+
+WORD_LENGTHS = tuple(range(word_index.MIN_LENGTH, word_index.MAX_LENGTH + 1))
+
+
+class WordResources:
+    """Lazily loaded, read-only word data for one words.txt, safe to share between threads"""
+
+    def __init__(self, words_file: str = word_index.WORDS_FILE, persist_bag: bool = False,
+                 solver_workers: int = 1):
+        self.words_file = words_file
+        # Hosted games share one in-memory bag; the desktop app persists its own
+        self.persist_bag = persist_bag
+        # One worker runs hints inline; a pool per server process would oversubscribe the box
+        self.solver_workers = solver_workers
+        # Build missing feedback matrices in the background (see matrix())
+        self.build_matrices = True
+        self._index: Optional[Mapping[int, WordStore]] = None
+        self._matrices: Dict[int, object] = {}
+        self._building: set = set()
+        self._lexicons: Dict[int, object] = {}
+        self._samplers: Dict[int, object] = {}
+        self._solvers: Dict[int, object] = {}
+        # Guards the dicts only; each item is built under its own lock, so a slow
+        # build (a lexicon, an alias table) never blocks other sessions' lookups
+        self._lock = threading.RLock()
+        self._build_locks: Dict[Tuple[str, int], threading.Lock] = {}
+
+    def _once(self, cache: Dict[int, object], kind: str, length: int, build: Callable[[WordStore], object]):
+        with self._lock:
+            if length in cache:
+                return cache[length]
+            build_lock = self._build_locks.setdefault((kind, length), threading.Lock())
+        store = self.store(length)
+        if store is None:
+            return None
+        with build_lock:
+            with self._lock:
+                if length in cache:
+                    return cache[length]
+            built = build(store)
+            with self._lock:
+                cache[length] = built
+            return built
+
+    def index(self) -> Mapping[int, WordStore]:
+        """The word index, built first if the cache is stale (normally done before serving)"""
+        with self._lock:
+            if self._index is None:
+                self._index = word_index.load_index(self.words_file)
+            return self._index
+
+    def store(self, length: int) -> Optional[WordStore]:
+        return self.index().get(length)
+
+    def matrix(self, length: int):
+        """The length's feedback matrix, or None while it is missing.
+
+        A missing matrix is built once in the background, unless build_matrices is
+        off (server workers, whose parent process built every matrix before forking).
+        """
+        import feedback_matrix
+        with self._lock:
+            if length in self._matrices:
+                return self._matrices[length]
+            if length in self._building:
+                return None
+            self._building.add(length)
+        store = self.store(length)
+        matrix = feedback_matrix.load(store, self.words_file) if store is not None else None
+        if matrix is not None or store is None or not self.build_matrices:
+            with self._lock:
+                self._building.discard(length)
+                if matrix is not None:
+                    self._matrices[length] = matrix
+            return matrix
+
+        def build():
+            try:
+                built = feedback_matrix.build(store, self.words_file)
+            except Exception:
+                built = None
+            with self._lock:
+                self._building.discard(length)
+                if built is not None:
+                    self._matrices[length] = built
+        # Not a daemon, so exiting mid-build does not leave its temp file behind
+        threading.Thread(target=build).start()
+        return None
+
+    def lexicon(self, length: int):
+        """Allowed guesses for the length, loaded (or built) once"""
+        return self._once(self._lexicons, "lexicon", length,
+                          lambda store: word_index.load_lexicon(store, self.words_file))
+
+    def sampler(self, length: int):
+        """Target sampler for the length; its no-repeat bag is shared by every game using it"""
+        from target_sampler import TargetSampler, bag_path
+        path = bag_path(self.words_file) if self.persist_bag else None
+        return self._once(self._samplers, "sampler", length, lambda store: TargetSampler(store, path=path))
+
+    def solver(self, length: int):
+        """Hint solver for the length; its opening table is computed once for everyone"""
+        from solver import Solver
+        solver = self._once(self._solvers, "solver", length,
+                            lambda store: Solver(store, self.words_file, workers=self.solver_workers))
+        if solver is None:
+            return None
+        solver.matrix = self.matrix(length)
+        return solver
+
+    def prewarm(self, lengths=WORD_LENGTHS):
+        """Load the index and the given lengths' data up front, so first sessions do not wait"""
+        import feedback_matrix
+        for length in lengths:
+            store = self.store(length)
+            if store is None:
+                continue
+            if self.build_matrices:
+                matrix = feedback_matrix.load_or_build(store, self.words_file)
+            else:
+                matrix = feedback_matrix.load(store, self.words_file)
+            if matrix is not None:
+                with self._lock:
+                    self._matrices[length] = matrix
+            self.sampler(length)
+            try:
+                self.lexicon(length)
+                # Cached on disk after the first process computes it
+                self.solver(length).opening()
+            except Exception:
+                # Valid-guess mode and hints load these on first use instead
+                pass
+
+
+_shared: Optional[WordResources] = None
+_shared_lock = threading.Lock()
+
+
+def shared_resources() -> WordResources:
+    """The process-wide WordResources used by every hosted session"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = WordResources()
+        return _shared